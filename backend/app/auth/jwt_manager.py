@@ -1,9 +1,14 @@
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Dict, Any
 from jose import JWTError, jwt
 from fastapi import HTTPException, status
+from jarvis_shared.metrics import CACHE_REQUESTS
 import app.config as config
-from app.auth.redis_sessions import is_token_blacklisted
+from app.auth.redis_sessions import blacklist_token, is_token_blacklisted
+from app.services.ttl_cache import TTLCache
 
 
 class JWTManager:
@@ -11,6 +16,12 @@ class JWTManager:
         self.secret_key = config.JWT_SECRET_KEY
         self.algorithm = config.JWT_ALGORITHM
         self.expire_minutes = config.JWT_EXPIRE_MINUTES
+        # token digest -> decoded payload, evicted at the token's own `exp`
+        self._verified = TTLCache(maxsize=config.JWT_CACHE_SIZE)
+
+    @staticmethod
+    def _cache_key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
 
     def create_access_token(self, user_data: Dict[str, Any]) -> str:
         """ Create a JWT access token for a user. """
@@ -23,20 +34,35 @@ class JWTManager:
             "tier": user_data.get("tier", "free"),
             "iat": int(datetime.utcnow().timestamp()),
             "exp": int(expire.timestamp()),
+            "jti": uuid.uuid4().hex,
         }
         return jwt.encode(token_data, self.secret_key, algorithm=self.algorithm)
 
-    async def verify_token(self, token: str) -> Dict[str, Any]:
-        """Verify a JWT token and check if it's blacklisted."""
+    @staticmethod
+    def revocation_id(token: str, claims: Dict[str, Any]) -> str:
+        """Key a token is revoked under: its `jti`, or a digest for tokens issued without one."""
+        return claims.get("jti") or hashlib.sha256(token.encode()).hexdigest()
 
-        if await is_token_blacklisted(token):
+    async def _ensure_not_revoked(self, token: str, payload: Dict[str, Any]):
+        if await is_token_blacklisted(self.revocation_id(token, payload)):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token revoked. Please log in again.",
             )
+
+    async def verify_token(self, token: str) -> Dict[str, Any]:
+        """Verify a JWT token and check if it's blacklisted."""
+
+        cache_key = self._cache_key(token)
+        cached = self._verified.get(cache_key)
+        if cached is not None:
+            CACHE_REQUESTS.labels("jwt", "hit").inc()
+            await self._ensure_not_revoked(token, cached)
+            return dict(cached)
+        CACHE_REQUESTS.labels("jwt", "miss").inc()
+
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            return payload
         except jwt.ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired"
@@ -46,6 +72,25 @@ class JWTManager:
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
             )
 
+        await self._ensure_not_revoked(token, payload)
+        if isinstance(payload.get("exp"), (int, float)):
+            self._verified.set(cache_key, payload, expires_at=payload["exp"])
+        return dict(payload)
+
+    async def revoke_token(self, token: str):
+        """Revoke a token for the rest of its lifetime and drop it from the verified cache."""
+        self._verified.pop(self._cache_key(token))
+        try:
+            claims = jwt.get_unverified_claims(token)
+        except JWTError:
+            return
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)) and exp > time.time():
+            await blacklist_token(self.revocation_id(token, claims), int(exp))
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._verified.stats()
+
     def cookie_settings(self):
         """ Get cookie settings for a JWT token. """
         return {
@@ -1,45 +1,149 @@
+import asyncio
 import logging
+import time
+from typing import Dict, Optional
 
-from app.services.redis_client import redis_client 
+import app.config as config
+from app.services.redis_client import redis_client
 
 logger = logging.getLogger(__name__)
 
 # Key patterns
-BLACKLIST_KEY = "blacklist:{token}"
+REVOKED_KEY = "revoked:{revocation_id}"
+REVOCATIONS_FEED_KEY = "revocations"  # ZSET member "{revocation_id}:{exp}", score = revoked-at (ms)
 USER_SESSIONS_KEY = "user_sessions:{user_id}"
 
 
-async def blacklist_token(token: str, expire_seconds: int):
+class RevocationFilter:
     """
-    Blacklist a JWT token so it cannot be reused.
+    Per-process mirror of revoked token ids.
+
+    Every replica pulls the `revocations` feed (a sorted set scored by revoke
+    time) every few seconds, so the common "not revoked" answer is served from
+    memory. A replica that revokes a token adds it locally at once; the others
+    see it within one sync interval. If syncing has been failing for longer
+    than the staleness bound, lookups fall back to a direct Redis check rather
+    than trusting an outdated mirror.
+    """
+
+    def __init__(self, sync_interval: float, max_staleness: float, overlap_ms: int):
+        self.sync_interval = sync_interval
+        self.max_staleness = max_staleness
+        self.overlap_ms = overlap_ms
+        self._revoked: Dict[str, float] = {}  # revocation_id -> token exp (unix seconds)
+        self._cursor: Optional[float] = None
+        self._synced_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, revocation_id: str, expires_at: float):
+        self._revoked[revocation_id] = expires_at
+
+    def _prune(self, now: float):
+        expired = [rid for rid, exp in self._revoked.items() if exp <= now]
+        for rid in expired:
+            del self._revoked[rid]
+
+    @property
+    def is_fresh(self) -> bool:
+        return (
+            self._synced_at is not None
+            and time.monotonic() - self._synced_at <= self.max_staleness
+        )
+
+    async def sync(self):
+        """Pull revocations added since the last sync (re-reading a small overlap for clock skew)."""
+        low = "-inf" if self._cursor is None else self._cursor - self.overlap_ms
+        entries = await redis_client.zrangebyscore(
+            REVOCATIONS_FEED_KEY, low, "+inf", withscores=True
+        )
+        for member, score in entries or []:
+            revocation_id, _, exp = str(member).rpartition(":")
+            try:
+                self.add(revocation_id, float(exp))
+            except ValueError:
+                continue
+            if self._cursor is None or float(score) > self._cursor:
+                self._cursor = float(score)
+        self._prune(time.time())
+        self._synced_at = time.monotonic()
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"Revocation feed sync failed: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def contains(self, revocation_id: str) -> bool:
+        exp = self._revoked.get(revocation_id)
+        if exp is not None:
+            return exp > time.time()
+        if self.is_fresh:
+            return False
+        key = REVOKED_KEY.format(revocation_id=revocation_id)
+        return await redis_client.exists(key) == 1
+
+
+revocation_filter = RevocationFilter(
+    sync_interval=config.REVOCATION_SYNC_INTERVAL,
+    max_staleness=config.REVOCATION_MAX_STALENESS,
+    overlap_ms=config.REVOCATION_SYNC_OVERLAP_MS,
+)
+
+
+async def blacklist_token(revocation_id: str, expires_at: int):
+    """
+    Revoke a JWT so it cannot be reused.
 
     Args:
-        token (str): The JWT token string
-        expire_seconds (int): Expiration time in seconds (usually token's own lifetime)
+        revocation_id (str): The token's `jti` (or a digest of the token when it has none)
+        expires_at (int): The token's own `exp`; the revocation is dropped after it
     """
+    expire_seconds = int(expires_at - time.time())
+    if expire_seconds <= 0:
+        return
+    revocation_filter.add(revocation_id, expires_at)
     try:
-        key = BLACKLIST_KEY.format(token=token)
-        await redis_client.set(key, "1", ex=expire_seconds)
-        logger.info(f"Token blacklisted for {expire_seconds}s: {token[:10]}...")
+        now_ms = int(time.time() * 1000)
+        pipe = redis_client.pipeline()
+        pipe.set(REVOKED_KEY.format(revocation_id=revocation_id), "1", ex=expire_seconds)
+        pipe.zadd(REVOCATIONS_FEED_KEY, {f"{revocation_id}:{int(expires_at)}": now_ms})
+        # Nothing older than the longest token lifetime can still matter
+        pipe.zremrangebyscore(
+            REVOCATIONS_FEED_KEY, "-inf", now_ms - config.JWT_EXPIRE_MINUTES * 60 * 1000
+        )
+        await pipe.exec()
+        logger.info(f"Token revoked for {expire_seconds}s: {revocation_id[:10]}...")
     except Exception as e:
-        logger.exception(f"Failed to blacklist token: {e}")
+        logger.exception(f"Failed to revoke token: {e}")
 
 
-async def is_token_blacklisted(token: str) -> bool:
+async def is_token_blacklisted(revocation_id: str) -> bool:
     """
-    Check if a token is blacklisted.
+    Check if a token is revoked, answered from the local mirror whenever it is fresh.
 
     Args:
-        token (str): The JWT token string
+        revocation_id (str): The token's `jti` (or a digest of the token when it has none)
 
     Returns:
-        bool: True if token is blacklisted, False otherwise
+        bool: True if token is revoked, False otherwise
     """
     try:
-        key = BLACKLIST_KEY.format(token=token)
-        return await redis_client.exists(key) == 1
+        return await revocation_filter.contains(revocation_id)
     except Exception as e:
         logger.exception(f"Failed to check token blacklist: {e}")
         return False
-
-
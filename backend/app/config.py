@@ -11,17 +11,69 @@ UPSTASH_REDIS_REST_TOKEN = os.getenv("UPSTASH_REDIS_REST_TOKEN")
 LIVEKIT_API_KEY = os.getenv("LIVEKIT_API_KEY")
 LIVEKIT_API_SECRET = os.getenv("LIVEKIT_API_SECRET")
 LIVEKIT_URL = os.getenv("LIVEKIT_URL")
+LIVEKIT_MAX_CONNECTIONS = int(os.getenv("LIVEKIT_MAX_CONNECTIONS", "20"))
+LIVEKIT_KEEPALIVE_SECONDS = float(os.getenv("LIVEKIT_KEEPALIVE_SECONDS", "60"))
+LIVEKIT_TIMEOUT_SECONDS = float(os.getenv("LIVEKIT_TIMEOUT_SECONDS", "10"))
+# Set (to the worker's AGENT_NAME) to dispatch the agent explicitly instead of into every new room
+LIVEKIT_AGENT_NAME = os.getenv("LIVEKIT_AGENT_NAME", "")
+
+# Pre-created rooms kept ready for new sessions (0 disables; needs LIVEKIT_AGENT_NAME)
+ROOM_POOL_SIZE = int(os.getenv("ROOM_POOL_SIZE", "0"))
+ROOM_POOL_TTL_SECONDS = int(os.getenv("ROOM_POOL_TTL_SECONDS", "300"))
+ROOM_POOL_REFILL_INTERVAL = float(os.getenv("ROOM_POOL_REFILL_INTERVAL", "5"))
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))  # verified tokens kept in memory
+
+# Local mirror of revoked tokens, refreshed from the Redis revocations feed
+REVOCATION_SYNC_INTERVAL = float(os.getenv("REVOCATION_SYNC_INTERVAL", "2"))  # seconds
+REVOCATION_MAX_STALENESS = float(os.getenv("REVOCATION_MAX_STALENESS", "10"))  # seconds before falling back to Redis
+REVOCATION_SYNC_OVERLAP_MS = int(os.getenv("REVOCATION_SYNC_OVERLAP_MS", "30000"))  # tolerated clock skew between replicas
 
 REDIS_URL = os.getenv("REDIS_URL")
 REDIS_TOKEN = os.getenv("REDIS_TOKEN")
+REDIS_BACKEND = os.getenv("REDIS_BACKEND", "upstash")  # "upstash" (REST) or "native" (RESP pool on REDIS_URL)
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
 
 FRONTEND_DOMAIN = os.getenv("FRONTEND_DOMAIN")
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
-GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
\ No newline at end of file
+GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
+
+# Sessions on tiers without a duration limit stay active this long past the last heartbeat
+SESSION_LEASE_SECONDS = int(os.getenv("SESSION_LEASE_SECONDS", "3600"))
+
+# Token-bucket limits for POST /sessions, as "requests/seconds" (one bucket per guest, user, IP and tier)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_SESSIONS_GUEST = os.getenv("RATE_LIMIT_SESSIONS_GUEST", "3/60")
+RATE_LIMIT_SESSIONS_USER = os.getenv("RATE_LIMIT_SESSIONS_USER", "10/60")
+RATE_LIMIT_SESSIONS_IP = os.getenv("RATE_LIMIT_SESSIONS_IP", "20/60")
+RATE_LIMIT_SESSIONS_TIER = os.getenv("RATE_LIMIT_SESSIONS_TIER", "600/60")  # all users of one tier together
+
+TIER_REFRESH_INTERVAL = float(os.getenv("TIER_REFRESH_INTERVAL", "300"))  # seconds; NOTIFY also triggers a reload
+
+# User rows: per-process LRU in front of an optional shared Redis copy
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))  # seconds, local layer
+USER_CACHE_SHARED = os.getenv("USER_CACHE_SHARED", "true").lower() == "true"
+USER_CACHE_SHARED_TTL = int(os.getenv("USER_CACHE_SHARED_TTL", "600"))  # seconds, Redis layer
+
+# Usage ledger: session seconds are batched in memory, then flushed to Redis and Postgres
+USAGE_FLUSH_INTERVAL = float(os.getenv("USAGE_FLUSH_INTERVAL", "5"))  # seconds
+USAGE_PERSIST_INTERVAL = float(os.getenv("USAGE_PERSIST_INTERVAL", "60"))  # seconds
+
+# On-demand request profiling (needs the "profiling" extra): send "X-Profile: <PROFILING_TOKEN>",
+# or set PROFILING_SAMPLE_RATE; the middleware is not installed when neither is set
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_DIR = os.getenv("PROFILING_DIR", "/tmp/backend-profiles")
+PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "50"))
+
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "10"))
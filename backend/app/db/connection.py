@@ -1,12 +1,76 @@
 import asyncpg
+import logging
+import re
 from contextlib import asynccontextmanager
-from app.config import DATABASE_URL
+from functools import lru_cache
+from typing import Optional
+from jarvis_shared.metrics import observe_dependency
+import app.config as config
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[asyncpg.Pool] = None
+
+_TABLE_RE = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE(?: IF NOT EXISTS)?)\s+(\w+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
+def query_operation(query: str) -> str:
+    """Metric label for a query, e.g. "SELECT users"; queries are fixed strings, so this stays bounded."""
+    words = query.split()
+    verb = words[0].upper() if words else "EMPTY"
+    table = _TABLE_RE.search(query)
+    return f"{verb} {table.group(1)}" if table else verb
+
+
+def _record_query(record: asyncpg.connection.LoggedQuery):
+    observe_dependency("postgres", query_operation(record.query), record.elapsed, record.exception)
+
+
+async def _init_connection(conn: asyncpg.Connection):
+    conn.add_query_logger(_record_query)
+
+
+async def init_db_pool() -> asyncpg.Pool:
+    """
+    Create the process-wide connection pool (called from the app lifespan).
+
+    Every pooled connection keeps an LRU of prepared statements, so the fixed
+    query strings in `app.db.*` are parsed and planned once per connection and
+    then executed by name on every later call.
+    """
+    global _pool
+    if _pool is None:
+        _pool = await asyncpg.create_pool(
+            config.DATABASE_URL,
+            min_size=config.DB_POOL_MIN_SIZE,
+            max_size=config.DB_POOL_MAX_SIZE,
+            statement_cache_size=config.DB_STATEMENT_CACHE_SIZE,
+            command_timeout=config.DB_COMMAND_TIMEOUT,
+            init=_init_connection,
+        )
+        logger.info(
+            f"Database pool ready (min={config.DB_POOL_MIN_SIZE}, max={config.DB_POOL_MAX_SIZE})"
+        )
+    return _pool
+
+
+async def close_db_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+        logger.info("Database pool closed")
+
+
+def get_db_pool() -> asyncpg.Pool:
+    if _pool is None:
+        raise RuntimeError("Database pool is not initialised; call init_db_pool() first")
+    return _pool
 
 
 @asynccontextmanager
 async def get_db_connection():
-    conn = await asyncpg.connect(DATABASE_URL)
-    try:
+    """Borrow a pooled connection for the duration of a query (or a short unit of work)."""
+    async with get_db_pool().acquire() as conn:
         yield conn
-    finally:
-        await conn.close()
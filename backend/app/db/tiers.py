@@ -1,28 +1,44 @@
-from typing import Optional
+from typing import List, Optional
 import asyncpg
 
+TIERS_CHANNEL = "tiers_changed"  # NOTIFY channel of the trigger in migrations/002_tiers_catalog.sql
+
+# Fixed query strings so pooled connections reuse their cached prepared statements.
+GET_TIER_BY_ID = "SELECT * FROM tiers WHERE id = $1"
+LIST_TIERS = "SELECT * FROM tiers"
+CREATE_TIER = """
+    INSERT INTO tiers (id, name, max_concurrent_sessions, daily_minutes, session_duration_seconds, features)
+    VALUES ($1, $2, $3, $4, $5, $6)
+    RETURNING *
+"""
+
 
 async def get_tier_by_id(conn: asyncpg.Connection, tier_id: str) -> Optional[dict]:
-    row = await conn.fetchrow("SELECT * FROM tiers WHERE id = $1", tier_id)
+    row = await conn.fetchrow(GET_TIER_BY_ID, tier_id)
     return dict(row) if row else None
 
 
+async def list_tiers(conn: asyncpg.Connection) -> List[dict]:
+    rows = await conn.fetch(LIST_TIERS)
+    return [dict(row) for row in rows]
+
+
 async def create_tier(
     conn: asyncpg.Connection,
     tier_id: str,
     name: str,
     max_concurrent_sessions: int,
-    daily_minutes: int,
+    daily_minutes: Optional[int],
+    session_duration_seconds: Optional[int] = None,
+    features: Optional[List[str]] = None,
 ) -> dict:
     row = await conn.fetchrow(
-        """
-        INSERT INTO tiers (id, name, max_concurrent_sessions, daily_minutes)
-        VALUES ($1, $2, $3, $4)
-        RETURNING *
-    """,
+        CREATE_TIER,
         tier_id,
         name,
         max_concurrent_sessions,
         daily_minutes,
+        session_duration_seconds,
+        features or [],
     )
     return dict(row)
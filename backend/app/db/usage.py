@@ -0,0 +1,26 @@
+from datetime import date
+from typing import Iterable, List, Tuple
+import asyncpg
+
+# Fixed query strings so pooled connections reuse their cached prepared statements.
+ADD_USAGE = """
+    INSERT INTO usage_daily (user_id, day, seconds)
+    VALUES ($1, $2, $3)
+    ON CONFLICT (user_id, day)
+    DO UPDATE SET seconds = usage_daily.seconds + EXCLUDED.seconds, updated_at = now()
+"""
+GET_USAGE_HISTORY = """
+    SELECT day, seconds FROM usage_daily
+    WHERE user_id = $1 AND day >= $2
+    ORDER BY day DESC
+"""
+
+
+async def add_usage(conn: asyncpg.Connection, rows: Iterable[Tuple[str, date, int]]):
+    """Add (user_id, day, seconds) increments in one batch."""
+    await conn.executemany(ADD_USAGE, list(rows))
+
+
+async def get_usage_history(conn: asyncpg.Connection, user_id: str, since: date) -> List[dict]:
+    rows = await conn.fetch(GET_USAGE_HISTORY, user_id, since)
+    return [dict(row) for row in rows]
@@ -1,24 +1,39 @@
+import uuid
 from typing import Optional, Dict, Any
 import asyncpg
 
+# Fixed query strings so pooled connections reuse their cached prepared statements.
+GET_USER_BY_ID = "SELECT * FROM users WHERE id = $1"
+GET_USER_BY_EMAIL = "SELECT * FROM users WHERE email = $1"
+CREATE_USER = """
+    INSERT INTO users (id, email, name, profile_pic, tier_id)
+    VALUES ($1, $2, $3, $4, $5)
+    RETURNING *
+"""
+# DO UPDATE (rather than DO NOTHING) makes RETURNING yield the existing row on conflict,
+# and refreshes the profile fields from the identity provider on every login.
+UPSERT_USER_BY_EMAIL = """
+    INSERT INTO users (id, email, name, profile_pic, tier_id)
+    VALUES ($1, $2, $3, $4, $5)
+    ON CONFLICT (email) DO UPDATE
+        SET name = EXCLUDED.name, profile_pic = EXCLUDED.profile_pic
+    RETURNING *
+"""
+
 
 async def get_user_by_id(conn: asyncpg.Connection, user_id: str) -> Optional[dict]:
-    row = await conn.fetchrow("SELECT * FROM users WHERE id = $1", user_id)
+    row = await conn.fetchrow(GET_USER_BY_ID, user_id)
     return dict(row) if row else None
 
 
 async def get_user_by_email(conn: asyncpg.Connection, email: str) -> Optional[dict]:
-    row = await conn.fetchrow("SELECT * FROM users WHERE email = $1", email)
+    row = await conn.fetchrow(GET_USER_BY_EMAIL, email)
     return dict(row) if row else None
 
 
 async def create_user(conn: asyncpg.Connection, user_data: Dict[str, Any]) -> dict:
     row = await conn.fetchrow(
-        """
-        INSERT INTO users (id, email, name, profile_pic, tier_id)
-        VALUES ($1, $2, $3, $4, $5)
-        RETURNING *
-    """,
+        CREATE_USER,
         user_data["id"],
         user_data["email"],
         user_data["name"],
@@ -32,20 +47,8 @@ async def create_user(conn: asyncpg.Connection, user_data: Dict[str, Any]) -> di
 async def get_or_create_user(
     conn: asyncpg.Connection, email: str, name: str, picture: str
 ) -> dict:
-    user = await get_user_by_email(conn, email)
-    if user:
-        return user
-
-    import uuid
-
-    user_id = str(uuid.uuid4())
-    return await create_user(
-        conn,
-        {
-            "id": user_id,
-            "email": email,
-            "name": name,
-            "profile_pic": picture,
-            "tier_id": "free",
-        },
+    """Insert the user, or update the existing row with the same email, in one round trip."""
+    row = await conn.fetchrow(
+        UPSERT_USER_BY_EMAIL, str(uuid.uuid4()), email, name, picture, "free"
     )
+    return dict(row)
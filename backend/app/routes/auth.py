@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse
 import json
 import logging
 import app.config as config
@@ -7,8 +7,7 @@ import app.config as config
 from app.auth.jwt_manager import jwt_manager
 from app.auth.dependencies import get_current_user_required
 from app.auth.oauth import oauth, get_google_user_info
-from app.db.connection import get_db_connection
-from app.db.users import get_or_create_user, get_user_by_id
+from app.services.user_cache import user_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -37,8 +36,7 @@ async def auth_callback(request: Request):
         name = user_info.get("name", "")
         picture = user_info.get("picture", "")
 
-        async with get_db_connection() as conn:
-            user = await get_or_create_user(conn, email, name, picture)
+        user = await user_cache.get_or_create(email, name, picture)
 
         token = jwt_manager.create_access_token(user)
 
@@ -58,6 +56,20 @@ async def auth_callback(request: Request):
         )
 
 
+@router.post("/logout")
+async def logout(request: Request):
+    token = request.cookies.get("access_token")
+    if token:
+        await jwt_manager.revoke_token(token)
+
+    response = JSONResponse({"status": "logged_out"})
+    settings = jwt_manager.cookie_settings()
+    response.delete_cookie(
+        key="access_token", path=settings["path"], domain=settings["domain"]
+    )
+    return response
+
+
 @router.get("/validate")
 async def validate_token(user=Depends(get_current_user_required)):
     return {"status": "valid", "user_id": user.get("sub")}
@@ -65,8 +77,7 @@ async def validate_token(user=Depends(get_current_user_required)):
 
 @router.get("/user")
 async def get_user_info(user=Depends(get_current_user_required)):
-    async with get_db_connection() as conn:
-        db_user = await get_user_by_id(conn, user.get("sub"))
-        if not db_user:
-            raise HTTPException(status_code=404, detail="User not found")
-        return db_user
+    db_user = await user_cache.get_by_id(user.get("sub"))
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
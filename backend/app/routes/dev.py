@@ -1,9 +1,18 @@
+import json
 import logging
-from typing import Dict, List, Any
+import time
+from typing import AsyncIterator, Dict, List, Any, Tuple
 
 from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 
+from app.auth.jwt_manager import jwt_manager
+from app.services.access_control import ACTIVE_SESSIONS_KEY
+from app.services.livekit import livekit_service
 from app.services.redis_client import redis_client
+from app.services.room_pool import room_pool
+from app.services.tier_catalog import tier_catalog
+from app.services.user_cache import user_cache
 
 
 logger = logging.getLogger(__name__)
@@ -11,70 +20,117 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/dev", tags=["dev"])
 
 
-async def _list_user_session_keys() -> List[str]:
-    """Return all redis keys that match user_sessions:* safely.
+ACTIVE_SESSIONS_PATTERN = ACTIVE_SESSIONS_KEY.format(user_id="*")
 
-    Tries KEYS first (simple for dev), falls back to iterative SCAN if not supported.
-    """
-    # Prefer KEYS for simplicity in dev tools
-    try:
-        keys = await redis_client.keys("user_sessions:*")
-        if keys is None:
-            return []
-        # Upstash returns list[str]
-        return keys  # type: ignore[return-value]
-    except Exception as e:
-        logger.debug(f"redis.keys not available, falling back to scan: {e}")
 
-    # Fallback to SCAN iteration
+async def _scan_sessions_page(cursor: int, count: int) -> Tuple[int, List[Dict[str, Any]]]:
+    """One SCAN page of active_sessions:* keys, with every key's live members read in a single pipeline."""
+    next_cursor, keys = await redis_client.scan(cursor, match=ACTIVE_SESSIONS_PATTERN, count=count)
+    if not keys:
+        return int(next_cursor), []
+
+    now_ms = int(time.time() * 1000)
+    pipe = redis_client.pipeline()
+    for key in keys:
+        pipe.zrangebyscore(key, now_ms, "+inf", withscores=True)
+    members = await pipe.exec()
+
+    users = []
+    for key, sessions in zip(keys, members):
+        session_list = [
+            {"session_id": session_id, "expires_at": int(deadline) // 1000}
+            for session_id, deadline in (sessions or [])
+        ]
+        if not session_list:
+            continue  # expired between SCAN and the read
+        users.append({
+            "user_id": key.split(":", 1)[-1],
+            "session_count": len(session_list),
+            "sessions": session_list,
+        })
+    return int(next_cursor), users
+
+
+async def _stream_all_sessions(count: int) -> AsyncIterator[str]:
     cursor = 0
-    all_keys: List[str] = []
+    while True:
+        try:
+            cursor, users = await _scan_sessions_page(cursor, count)
+        except Exception as e:
+            logger.exception(f"Failed to scan sessions: {e}")
+            yield json.dumps({"error": "scan failed", "cursor": cursor}) + "\n"
+            return
+        for user in users:
+            yield json.dumps(user) + "\n"
+        if cursor == 0:
+            return
+
+
+@router.get("/sessions", status_code=status.HTTP_200_OK)
+async def list_all_sessions(
+    cursor: int = Query(0, ge=0, description="SCAN cursor from the previous page; 0 starts over."),
+    count: int = Query(500, ge=1, le=10000, description="Keys to examine per page (SCAN COUNT hint)."),
+    stream: bool = Query(False, description="Stream every user as NDJSON instead of returning one page."),
+):
+    """
+    List active sessions across all users (dev helper).
+
+    Paged over SCAN; the response's `cursor` is passed back to get the next page
+    and is 0 once the keyspace has been covered. Pages can be empty or uneven.
+    With `stream=true` all pages are walked and written out as NDJSON, one user
+    per line, so a full dump runs in constant memory.
+    """
+    if stream:
+        return StreamingResponse(_stream_all_sessions(count), media_type="application/x-ndjson")
+
     try:
-        while True:
-            res = await redis_client.scan(cursor, match="user_sessions:*", count=1000)
-            # Expect `(next_cursor, keys)`
-            if isinstance(res, (list, tuple)) and len(res) == 2:
-                cursor, batch = res
-                if batch:
-                    all_keys.extend(batch)
-                if not cursor or int(cursor) == 0:
-                    break
-            else:
-                # Unexpected shape; bail
-                break
+        next_cursor, users = await _scan_sessions_page(cursor, count)
     except Exception as e:
-        logger.exception(f"Failed to scan for session keys: {e}")
-        return []
+        logger.exception(f"Failed to scan sessions: {e}")
+        raise HTTPException(status_code=500, detail="Failed to list sessions")
 
-    return all_keys
+    return {
+        "cursor": next_cursor,
+        "total_users": len(users),
+        "total_sessions": sum(u["session_count"] for u in users),
+        "users": users,
+    }
 
 
-@router.get("/sessions", status_code=status.HTTP_200_OK)
-async def list_all_sessions() -> Dict[str, Any]:
-    """List active sessions across all users (dev helper)."""
-    keys = await _list_user_session_keys()
-    users: List[Dict[str, Any]] = []
-    total_sessions = 0
+@router.get("/auth/cache", status_code=status.HTTP_200_OK)
+async def jwt_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the in-process verified-JWT cache."""
+    return jwt_manager.cache_stats()
+
+
+@router.get("/users/cache", status_code=status.HTTP_200_OK)
+async def user_cache_stats() -> Dict[str, Any]:
+    """User profile cache hit rate and how often lookups reached Postgres."""
+    return user_cache.stats()
+
+
+@router.get("/livekit/health", status_code=status.HTTP_200_OK)
+async def livekit_health() -> Dict[str, Any]:
+    """Round trip to LiveKit over the shared API client."""
+    healthy = await livekit_service.health_check()
+    if not healthy:
+        raise HTTPException(status_code=503, detail="LiveKit unreachable")
+    return {"status": "ok"}
+
+
+@router.get("/livekit/room-pool", status_code=status.HTTP_200_OK)
+async def room_pool_stats() -> Dict[str, Any]:
+    """Warm room pool depth and claim latency."""
+    return room_pool.stats()
 
-    for key in keys:
-        try:
-            sessions = await redis_client.smembers(key)  # type: ignore[arg-type]
-            user_id = key.split(":", 1)[-1].replace("user_sessions:", "")
-            # Some clients include full key; ensure only the part after prefix
-            if user_id.startswith("user_sessions:"):
-                user_id = user_id.split(":", 1)[-1]
-
-            session_list = list(sessions or [])
-            users.append({
-                "user_id": user_id,
-                "session_count": len(session_list),
-                "sessions": session_list,
-            })
-            total_sessions += len(session_list)
-        except Exception as e:
-            logger.exception(f"Failed to fetch sessions for key {key}: {e}")
 
-    return {"total_users": len(users), "total_sessions": total_sessions, "users": users}
+@router.get("/tiers", status_code=status.HTTP_200_OK)
+async def tiers() -> Dict[str, Any]:
+    """The tier catalog snapshot currently served by this process."""
+    return {
+        "loaded_at": tier_catalog.loaded_at,
+        "tiers": {tier_id: limits.model_dump() for tier_id, limits in tier_catalog.snapshot().items()},
+    }
 
 
 @router.post("/redis/flush", status_code=status.HTTP_202_ACCEPTED)
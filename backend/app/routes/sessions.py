@@ -1,27 +1,77 @@
 # app/routes/sessions.py
+import asyncio
 import json
-from fastapi import APIRouter, Depends, Request, HTTPException, status
-from uuid import uuid4
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Query, Request, Response, HTTPException, status
 import logging
+from jarvis_shared.rate_limiter import Rate, RateLimiter
+import app.config as config
 from app.auth.dependencies import get_user_id_or_guest
+from app.db.connection import get_db_connection
+from app.db.usage import get_usage_history
 from app.schemas.sessions import (
     CreateSessionRequest,
     CreateSessionResponse,
     EndSessionRequest,
     EndSessionResponse,
+    SessionHeartbeatResponse,
+    UsageHistoryResponse,
 )
-from app.services.redis_client import redis_client
-from app.services.access_control import access_control
+from app.services.access_control import SESSIONS, access_control
 from app.services.exceptions import TierNotFoundError, LimitExceededError
 from app.services.livekit import livekit_service
+from app.services.redis_client import redis_client
+from app.services.room_pool import room_pool
 from app.voice_config import get_voice_by_id
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
+session_rate_limiter = RateLimiter(redis_client, name="sessions")
+GUEST_RATE = Rate.parse(config.RATE_LIMIT_SESSIONS_GUEST)
+USER_RATE = Rate.parse(config.RATE_LIMIT_SESSIONS_USER)
+IP_RATE = Rate.parse(config.RATE_LIMIT_SESSIONS_IP)
+TIER_RATE = Rate.parse(config.RATE_LIMIT_SESSIONS_TIER)
+
+
+async def limit_session_creation(
+    request: Request, response: Response, user_info=Depends(get_user_id_or_guest)
+):
+    """Throttle session creation per user, per client IP and per tier before any room is touched."""
+    if not config.RATE_LIMIT_ENABLED:
+        return
+    user_id, tier = user_info
+    limiter = session_rate_limiter
+    decision = await limiter.hit([
+        (limiter.key("user", user_id), GUEST_RATE if tier == "guest" else USER_RATE),
+        (limiter.key("ip", request.client.host), IP_RATE),
+        (limiter.key("tier", tier), TIER_RATE),
+    ])
+    if decision is None:
+        return
+    if not decision.allowed:
+        logger.warning(f"Session create rate limited for {user_id} ({tier}) | IP: {request.client.host}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many session requests, try again later",
+            headers=decision.headers(),
+        )
+    response.headers.update(decision.headers())
+
+
+async def _rollback_session(user_id: str, session_id: str):
+    """Best-effort undo of an admitted session whose room failed: release the admission and drop the room."""
+    undo = [livekit_service.delete_room(session_id), access_control.release_session(user_id, session_id)]
+    for result in await asyncio.gather(*undo, return_exceptions=True):
+        if isinstance(result, BaseException):
+            logger.error(f"Rollback step failed for session {session_id}: {result}")
+
 
 @router.post(
-    "", status_code=status.HTTP_201_CREATED, response_model=CreateSessionResponse
+    "",
+    status_code=status.HTTP_201_CREATED,
+    response_model=CreateSessionResponse,
+    dependencies=[Depends(limit_session_creation)],
 )
 async def create_session(
     request: Request,
@@ -41,50 +91,45 @@ async def create_session(
     )
 
     try:
-        # Check tier & usage permissions
-        check = await access_control.check_permission(user_id, tier)
-        if not check.allowed:
-            raise HTTPException(
-                status_code=403, detail={"reason": check.reason, "action": check.action}
-            )
-
-        # Generate unique session ID
-        session_id = str(uuid4())
-
-        # Track session in Redis
-        await access_control.start_session(user_id, session_id)
-
         voice = get_voice_by_id(body.voice_id).model_dump()
-        agent_config = {"model_id": body.model_id, "voice": voice}
-
-        # Save to Redis for the worker to fetch later
-        await redis_client.setex(
-            f"Agent-Config:{session_id}",
-            1800,  # expire in 30 mins  TODO match session length
-            json.dumps(agent_config),
-        )
-
-        # Create LiveKit room
-        await livekit_service.create_room(session_id, json.dumps(agent_config))
-
-        # Generate LiveKit token
+        agent_config = json.dumps({"model_id": body.model_id, "voice": voice})
+
+        # Take a pre-created room if one is ready; its name is the session ID
+        room = room_pool.checkout()
+        session_id = room.name
+
+        # Admission (limits + session tracking + agent config, one atomic Redis call)
+        # comes first, so rejected requests never claim a room or dispatch an agent.
+        # The room step is a single LiveKit call that carries the dispatch, so there
+        # is nothing left to overlap with admission without dispatching speculatively
+        try:
+            admission = await access_control.admit_session(user_id, tier, session_id, agent_config)
+        except Exception:
+            room_pool.checkin(room)
+            raise
+
+        try:
+            await room_pool.activate(room, agent_config)
+        except Exception:
+            await _rollback_session(user_id, session_id)
+            raise
+
+        # Generate LiveKit token (local signing, no I/O)
         livekit_token = livekit_service.generate_token(
             session_id,
             user_id,
         )
 
-        # Compute usage + remaining to return to the frontend
-        usage_today = await access_control._get_daily_usage(user_id)
-        remaining_minutes = await access_control.get_remaining_minutes(user_id, tier)
         limits = access_control.get_limits(tier)
+        SESSIONS.labels("created", tier).inc()
 
         return CreateSessionResponse(
             session_id=session_id,  # str -> auto-validated as UUID if you pass UUID(session_id)
             tier=tier,
             features=limits.features,
             max_session_duration_seconds=limits.session_duration,
-            usage_today_minutes=usage_today,
-            remaining_today_minutes=remaining_minutes,
+            usage_today_minutes=admission.usage_today_minutes,
+            remaining_today_minutes=admission.remaining_today_minutes,
             livekit_url=livekit_service.livekit_url,
             livekit_token=livekit_token,
             ip=client_ip,
@@ -99,6 +144,7 @@ async def create_session(
 
     except LimitExceededError as e:
         logger.info(f"Limit exceeded for user {user_id}: {e}")
+        SESSIONS.labels("rejected", tier).inc()
         raise HTTPException(
             status_code=403, detail={"reason": e.reason, "action": e.action}
         )
@@ -108,6 +154,41 @@ async def create_session(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.get("/usage", response_model=UsageHistoryResponse)
+async def usage_history(
+    days: int = Query(30, ge=1, le=366, description="How many days back to include"),
+    user_info=Depends(get_user_id_or_guest),
+):
+    """
+    Daily usage history for the caller, from the Postgres usage ledger.
+    Lags live usage by up to one persist interval.
+    """
+    user_id, _ = user_info
+    since = (datetime.utcnow() - timedelta(days=days - 1)).date()
+    async with get_db_connection() as conn:
+        rows = await get_usage_history(conn, user_id, since)
+    return UsageHistoryResponse(user_id=user_id, days=rows)
+
+
+@router.post("/{session_id}/heartbeat", response_model=SessionHeartbeatResponse)
+async def heartbeat(session_id: str, user_info=Depends(get_user_id_or_guest)):
+    """
+    Keep a session counted as active. Clients should call this well within
+    SESSION_LEASE_SECONDS; sessions on tiers with a duration limit keep their deadline.
+    """
+    user_id, tier = user_info
+    try:
+        deadline_ms = await access_control.heartbeat(user_id, tier, session_id)
+    except TierNotFoundError as e:
+        logger.warning(f"Tier not found for user {user_id}: {e}")
+        raise HTTPException(
+            status_code=400, detail={"reason": e.reason, "action": e.action}
+        )
+    if deadline_ms is None:
+        raise HTTPException(status_code=404, detail="No active sessions found")
+    return SessionHeartbeatResponse(session_id=session_id, expires_at=deadline_ms // 1000)
+
+
 @router.delete("/{session_id}", status_code=status.HTTP_202_ACCEPTED, response_model=EndSessionResponse)
 async def end_session(
     session_id: str,
@@ -117,41 +198,40 @@ async def end_session(
 ):
     """
     End an active session and record its duration in usage limits.
+    Usage is billed from the time measured server-side; the reported duration is only logged.
     """
     user_id, tier = user_info
     client_ip = request.client.host
 
     try:
-        # Validate that the session exists for the user
-        active_sessions = await access_control.get_active_sessions(user_id)
-        if active_sessions == 0:
-            raise HTTPException(status_code=404, detail="No active sessions found")
-
-        duration_seconds = body.duration_seconds
-        if duration_seconds <= 0:
+        if body.duration_seconds <= 0:
             logger.warning(f"No valid session duration provided for {session_id}")
-            duration_seconds = 0
 
-        # Remove session from Redis & update daily usage
-        await access_control.end_session(user_id, session_id, duration_seconds)
+        # Remove session from Redis & update daily usage in one call; it also
+        # tells us whether this session belongs to the user
+        ended = await access_control.end_session(user_id, session_id, body.duration_seconds)
+        if ended is None:
+            raise HTTPException(status_code=404, detail="No active sessions found")
 
-        # Delete LiveKit room
+        # Delete LiveKit room (only once ownership is confirmed)
         await livekit_service.delete_room(session_id)
 
         # Return new usage snapshot so the UI updates immediately
-        usage_today = await access_control._get_daily_usage(user_id)
-        remaining_minutes = await access_control.get_remaining_minutes(user_id, tier)
+        remaining_minutes = access_control.remaining_minutes(
+            access_control.get_limits(tier), ended.usage_today_minutes
+        )
 
         logger.info(
             f"Ended session {session_id} for {user_id} | "
-            f"Duration: {duration_seconds}s | IP: {client_ip}"
+            f"Duration: {ended.duration_seconds}s (reported {body.duration_seconds}s) | IP: {client_ip}"
         )
+        SESSIONS.labels("ended", tier).inc()
 
         return EndSessionResponse(
             status="ended",
             session_id=session_id,
-            duration_seconds=duration_seconds,
-            usage_today_minutes=usage_today,
+            duration_seconds=ended.duration_seconds,
+            usage_today_minutes=ended.usage_today_minutes,
             remaining_today_minutes=remaining_minutes,
         )
 
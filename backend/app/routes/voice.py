@@ -1,18 +1,29 @@
 from typing import List
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Request
+from app.auth.dependencies import get_current_user_optional
 from app.model_config import ModelConfig, get_all_models
+from app.services.static_catalog import StaticCatalog
 from app.voice_config import get_all_voices, VoiceConfig
 
 
 
 router = APIRouter(tags=["voice"])
 
+# Serialized once per process; guests get only the entries available to them.
+voices_catalog = StaticCatalog("voices", get_all_voices())
+models_catalog = StaticCatalog("models", get_all_models())
+
+
+def _tier(user) -> str:
+    return user.get("tier", "free") if user else "guest"
+
+
 @router.get("/voices", response_model=List[VoiceConfig], status_code=200)
-def list_voices():
-    return get_all_voices()
+async def list_voices(request: Request, user=Depends(get_current_user_optional)):
+    return voices_catalog.respond(request, _tier(user))
 
 
 
 @router.get("/models", response_model=List[ModelConfig], status_code=200)
-def list_models():
-    return get_all_models()
+async def list_models(request: Request, user=Depends(get_current_user_optional)):
+    return models_catalog.respond(request, _tier(user))
@@ -0,0 +1,58 @@
+# app/routes/webhooks.py
+import logging
+from fastapi import APIRouter, Header, HTTPException, Request, status
+from app.services.access_control import SESSIONS, access_control
+from app.services.livekit import livekit_service
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+
+SESSION_END_EVENTS = ("room_finished", "participant_left")
+
+
+@router.post("/livekit")
+async def livekit_webhook(request: Request, authorization: str = Header(None)):
+    """
+    LiveKit webhook (configure `<backend>/webhooks/livekit` in LiveKit, signed with
+    the API key/secret). Ends the session when its room finishes or its user leaves,
+    metering usage from server timestamps, so sessions end even if the client never
+    calls DELETE /sessions/{id}. Redelivered events are acknowledged without effect.
+    """
+    body = (await request.body()).decode()
+    try:
+        event = livekit_service.webhook_receiver.receive(body, authorization or "")
+    except Exception as e:
+        logger.warning(f"Rejected LiveKit webhook: {e}")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid webhook signature")
+
+    if event.event not in SESSION_END_EVENTS:
+        return {"status": "ignored"}
+
+    session_id = event.room.name
+    owner = await access_control.get_session_owner(session_id)
+    if owner is None:
+        # Already ended (client, an earlier event, or a retry) or a room that was never a session
+        return {"status": "ignored"}
+    user_id, tier = owner
+
+    # Only the session's user leaving ends it; the agent leaving does not
+    if event.event == "participant_left" and event.participant.identity != user_id:
+        return {"status": "ignored"}
+
+    ended_at_ms = event.created_at * 1000 if event.created_at else None
+    ended = await access_control.end_session(user_id, session_id, ended_at_ms=ended_at_ms)
+    if ended is None:
+        return {"status": "ignored"}
+
+    if event.event == "participant_left":
+        try:
+            await livekit_service.delete_room(session_id)
+        except Exception as e:
+            logger.warning(f"Could not delete room {session_id} after its user left: {e}")
+
+    logger.info(
+        f"Ended session {session_id} for {user_id} from LiveKit {event.event} | "
+        f"Duration: {ended.duration_seconds}s"
+    )
+    SESSIONS.labels("ended_by_webhook", tier).inc()
+    return {"status": "ended", "session_id": session_id, "duration_seconds": ended.duration_seconds}
@@ -1,15 +1,22 @@
 # app/schemas/access_control.py
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
 
 class TierLimits(BaseModel):
+    model_config = ConfigDict(frozen=True)  # shared by every request via the tier catalog
+
     name: str
     session_duration: Optional[int]  # in seconds
     concurrent_sessions: int
     daily_limit: Optional[int]       # in minutes
     features: List[str]
 
-class AccessResult(BaseModel):
-    allowed: bool
-    reason: Optional[str] = None
-    action: Optional[str] = None
+class AdmissionResult(BaseModel):
+    active_sessions: int
+    usage_today_minutes: int
+    remaining_today_minutes: Optional[int] = None  # None => unlimited
+
+class SessionEndResult(BaseModel):
+    user_id: str
+    duration_seconds: int  # as recorded in usage
+    usage_today_minutes: int
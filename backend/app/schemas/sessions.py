@@ -1,3 +1,4 @@
+from datetime import date
 from typing import List, Literal, Optional
 from uuid import UUID
 from pydantic import AnyUrl, BaseModel
@@ -17,15 +18,12 @@ class CreateSessionRequest(BaseModel):
 
 
 class EndSessionRequest(BaseModel):
-    duration_seconds: int = Field(..., description="Duration of the session in seconds")
-
-
-TierLiteral = Literal["guest", "free"]  # extend as you add tiers
+    duration_seconds: int = Field(..., description="Client-measured duration in seconds (logged only; usage is billed from server time)")
 
 
 class CreateSessionResponse(BaseModel):
     session_id: UUID = Field(..., description="Unique session identifier (UUID)")
-    tier: TierLiteral = Field(..., description="The user's access tier")
+    tier: str = Field(..., description="The user's access tier (an id from the tier catalog)")
     features: List[str] = Field(
         default_factory=list, description="Enabled feature flags for the tier"
     )
@@ -52,7 +50,7 @@ class EndSessionResponse(BaseModel):
     status: Literal["ended"] = Field(..., description="End-of-session marker")
     session_id: UUID = Field(..., description="The ended session id")
     duration_seconds: int = Field(
-        ..., ge=0, description="Reported session duration in seconds"
+        ..., ge=0, description="Recorded session duration in seconds (measured server-side)"
     )
     usage_today_minutes: int = Field(
         ..., ge=0, description="Minutes used today (after this call)"
@@ -60,3 +58,22 @@ class EndSessionResponse(BaseModel):
     remaining_today_minutes: Optional[int] = Field(
         None, ge=0, description="Minutes remaining today; None means unlimited"
     )
+
+
+class SessionHeartbeatResponse(BaseModel):
+    session_id: UUID = Field(..., description="The session kept alive")
+    expires_at: int = Field(
+        ..., description="Unix time (seconds) after which the session stops counting as active"
+    )
+
+
+class DailyUsage(BaseModel):
+    day: date = Field(..., description="UTC day")
+    seconds: int = Field(..., ge=0, description="Session seconds used that day")
+
+
+class UsageHistoryResponse(BaseModel):
+    user_id: str = Field(..., description="User (or guest) the history belongs to")
+    days: List[DailyUsage] = Field(
+        default_factory=list, description="Most recent day first; days without usage are omitted"
+    )
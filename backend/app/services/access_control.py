@@ -1,110 +1,283 @@
 # app/services/access_control.py
 import hashlib
-from datetime import datetime
-from typing import Optional
+import time
+from typing import Optional, Tuple
 import logging
-from app.schemas.access_control import AccessResult, TierLimits
+from prometheus_client import Counter
+from jarvis_shared.redis_scripts import RedisScript
+import app.config as config
+from app.schemas.access_control import AdmissionResult, SessionEndResult, TierLimits
 from app.services.exceptions import LimitExceededError, TierNotFoundError
 from app.services.redis_client import redis_client
+from app.services.tier_catalog import TierCatalog, tier_catalog
+from app.services.usage_ledger import UsageLedger, today, usage_ledger, usage_key
 
 logger = logging.getLogger(__name__)
 
+ACTIVE_SESSIONS_KEY = "active_sessions:{user_id}"
+SESSION_GRACE_SECONDS = 60  # lets a client end a session that just ran to its deadline
+AGENT_CONFIG_TTL = 1800  # TODO match session length
+SESSION_RECORD_KEY = "Session:{session_id}"
+SESSION_RECORD_TTL = 86400  # outlives any session; only needed until it is ended
+
+SESSIONS = Counter(
+    "sessions_total",
+    "Session lifecycle events",
+    ["event", "tier"],
+)
+
+ADMIT_CONCURRENCY_EXCEEDED = 1
+ADMIT_DAILY_LIMIT_EXCEEDED = 2
+
+# Active sessions are a ZSET scored by deadline (unix ms); the key expires with its last member.
+
+# KEYS: active sessions, daily usage (seconds), agent config, session record
+# ARGV: session_id, max concurrent, daily limit in seconds (-1 = unlimited), now (ms),
+#       session deadline (ms), agent config, config ttl, seconds recorded locally but not yet flushed,
+#       user_id, tier, record ttl
+# Returns {status, active sessions, seconds used today}
+ADMIT_SESSION_SCRIPT = RedisScript("""
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[4])
+local active = redis.call('ZCARD', KEYS[1])
+local used = tonumber(redis.call('GET', KEYS[2]) or '0') + tonumber(ARGV[8])
+if active >= tonumber(ARGV[2]) then
+    return {1, active, used}
+end
+local daily_limit = tonumber(ARGV[3])
+if daily_limit >= 0 and used >= daily_limit then
+    return {2, active, used}
+end
+redis.call('ZADD', KEYS[1], ARGV[5], ARGV[1])
+local last = redis.call('ZRANGE', KEYS[1], -1, -1, 'WITHSCORES')
+redis.call('PEXPIREAT', KEYS[1], math.floor(tonumber(last[2])))
+redis.call('SET', KEYS[3], ARGV[6], 'EX', ARGV[7])
+redis.call('HSET', KEYS[4], 'user_id', ARGV[9], 'tier', ARGV[10], 'started_at', ARGV[4])
+redis.call('EXPIRE', KEYS[4], ARGV[11])
+return {0, active + 1, used}
+""")
+
+# KEYS: active sessions
+# ARGV: session_id, now (ms), extended deadline (ms; 0 = keep the current one)
+# Returns the session's deadline in ms, or -1 if it is not active
+HEARTBEAT_SCRIPT = RedisScript("""
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not score then
+    return -1
+end
+local deadline = tonumber(score)
+if deadline <= tonumber(ARGV[2]) then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    return -1
+end
+local extended = tonumber(ARGV[3])
+if extended > deadline then
+    deadline = extended
+    redis.call('ZADD', KEYS[1], 'XX', deadline, ARGV[1])
+    local last = redis.call('ZRANGE', KEYS[1], -1, -1, 'WITHSCORES')
+    redis.call('PEXPIREAT', KEYS[1], math.floor(tonumber(last[2])))
+end
+return deadline
+""")
+
+# KEYS: active sessions, daily usage (seconds), session record
+# ARGV: session_id, user_id
+# The session record decides ownership, so a session whose ZSET member was already
+# pruned (past its deadline) is still ended and billed. Ending another user's or an
+# already-ended session leaves everything untouched. Sessions admitted before
+# records existed are ended by their ZSET member alone.
+# Returns {seconds used today as stored in Redis, or -1 if there was no such session,
+#          session start (ms), or 0 if unknown}
+END_SESSION_SCRIPT = RedisScript("""
+local record = redis.call('HMGET', KEYS[3], 'user_id', 'started_at')
+if record[1] then
+    if record[1] ~= ARGV[2] then
+        return {-1, 0}
+    end
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    redis.call('DEL', KEYS[3])
+elseif redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+    return {-1, 0}
+end
+return {tonumber(redis.call('GET', KEYS[2]) or '0'), tonumber(record[2] or '0')}
+""")
+
+
+def active_sessions_key(user_id: str) -> str:
+    return ACTIVE_SESSIONS_KEY.format(user_id=user_id)
+
+
+def session_record_key(session_id: str) -> str:
+    return SESSION_RECORD_KEY.format(session_id=session_id)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
 
 class AccessControlService:
-    def __init__(self, redis_client):
+    def __init__(self, redis_client, usage: UsageLedger, tiers: TierCatalog):
         self.redis = redis_client
-        self.tiers = {
-            "guest": TierLimits(
-                name="Guest",
-                session_duration=600,  # 10 min # TODO make this 2-3 min after testing
-                concurrent_sessions=50, # TODO make this 1 after testing
-                daily_limit=2,  # 2 min/day
-                features=["basic_voice_chat"],
-            ),
-            "free": TierLimits(
-                name="Free",
-                session_duration=None,  # Unlimited per session
-                concurrent_sessions=50, #TODO make this 2 after testing
-                daily_limit=600,  # 10 min/day
-                features=["voice_chat", "long_sessions"],
-            ),
-        }
-    
+        self.usage = usage
+        self.tiers = tiers
+
     def get_limits(self, tier: str) -> TierLimits:
-        if tier not in self.tiers:
+        limits = self.tiers.get(tier)
+        if limits is None:
             raise TierNotFoundError(reason=f"Invalid tier: {tier}", action="Check tiers")
-        return self.tiers[tier]
-
-    async def get_active_sessions(self, user_id: str) -> int:
-        """Returns the number of active sessions for a user."""
-        return await self.redis.scard(f"user_sessions:{user_id}") or 0
-
-    async def _get_daily_usage(self, user_id: str) -> int:
-        """Returns the number of minutes used today for the user."""
-        today = datetime.utcnow().strftime("%Y-%m-%d")
-        return int(await self.redis.get(f"user_daily_usage:{user_id}:{today}") or 0)
-    
-    async def get_remaining_minutes(self, user_id: str, tier: str) -> Optional[int]:
-        limits = self.get_limits(tier)
+        return limits
+
+    @staticmethod
+    def session_deadline_ms(limits: TierLimits, now_ms: int) -> int:
+        """Hard limit for tiers with a session duration, otherwise a lease that heartbeats renew."""
+        lease = limits.session_duration
+        if lease is None:
+            lease = config.SESSION_LEASE_SECONDS
+        return now_ms + (lease + SESSION_GRACE_SECONDS) * 1000
+
+    @staticmethod
+    def remaining_minutes(limits: TierLimits, used: int) -> Optional[int]:
         if limits.daily_limit is None:
             return None
-        used = await self._get_daily_usage(user_id)
         return max(limits.daily_limit - used, 0)
 
-    async def check_permission(self, user_id: str, tier: str) -> AccessResult:
-        """Checks if a user has permission to access a given tier."""
-        if tier not in self.tiers:
+    async def admit_session(
+        self, user_id: str, tier: str, session_id: str, agent_config: str
+    ) -> AdmissionResult:
+        """
+        Checks the tier limits and registers the session in a single atomic round trip.
+
+        Redis Structures:
+            active_sessions:{user_id}                       = ZSET of session IDs scored by deadline (ms)
+            user_daily_usage_seconds:{user_id}:{YYYY-MM-DD} = Integer (seconds used that day)
+            Agent-Config:{session_id}                       = JSON agent config for the worker
+            Session:{session_id}                            = Hash {user_id, tier, started_at (ms)}
+
+        Sessions past their deadline are dropped before counting, so crashed
+        sessions stop counting against the concurrency limit on their own.
+        """
+        limits = self.tiers.get(tier)
+        if limits is None:
             logger.warning(f"Tier '{tier}' not found for user {user_id}")
             raise TierNotFoundError(reason=f"Invalid tier: {tier}", action="Check tiers")
+        day = today()
+        now_ms = _now_ms()
 
-        limits = self.tiers[tier]
+        status, active_count, used_seconds = await ADMIT_SESSION_SCRIPT(
+            self.redis,
+            keys=[
+                active_sessions_key(user_id),
+                usage_key(user_id, day),
+                f"Agent-Config:{session_id}",
+                session_record_key(session_id),
+            ],
+            args=[
+                session_id,
+                limits.concurrent_sessions,
+                -1 if limits.daily_limit is None else limits.daily_limit * 60,
+                now_ms,
+                self.session_deadline_ms(limits, now_ms),
+                agent_config,
+                AGENT_CONFIG_TTL,
+                self.usage.pending(user_id, day),
+                user_id,
+                tier,
+                SESSION_RECORD_TTL,
+            ],
+        )
 
-        # Concurrent session check
-        active_count = await self.get_active_sessions(user_id)
-        if active_count >= limits.concurrent_sessions:
+        if int(status) == ADMIT_CONCURRENCY_EXCEEDED:
             raise LimitExceededError(reason="Concurrent session limit reached", action="Close old sessions")
-
-        # Daily usage check
-        usage = await self._get_daily_usage(user_id)
-        if limits.daily_limit is not None and usage >= limits.daily_limit:
+        if int(status) == ADMIT_DAILY_LIMIT_EXCEEDED:
             raise LimitExceededError(reason="Daily usage limit reached", action="Login to get more minutes")
 
-        return AccessResult(allowed=True)
+        usage = int(used_seconds) // 60
+        return AdmissionResult(
+            active_sessions=int(active_count),
+            usage_today_minutes=usage,
+            remaining_today_minutes=self.remaining_minutes(limits, usage),
+        )
+
+    async def release_session(self, user_id: str, session_id: str):
+        """Undoes a successful admission whose session could not be set up."""
+        pipe = self.redis.pipeline()
+        pipe.zrem(active_sessions_key(user_id), session_id)
+        pipe.delete(f"Agent-Config:{session_id}", session_record_key(session_id))
+        await pipe.exec()
 
-    async def start_session(self, user_id: str, session_id: str):
+    async def heartbeat(self, user_id: str, tier: str, session_id: str) -> Optional[int]:
         """
-        Marks a new session as active for the user in Redis.
+        Keeps a session counted as active. Sessions on tiers without a duration
+        limit get their lease renewed; others keep their fixed deadline.
 
-        Redis Structure:
-            user_sessions:{user_id} = SET of active session IDs
+        Returns the session's deadline (unix ms), or None if it is not active.
         """
+        limits = self.get_limits(tier)
+        now_ms = _now_ms()
+        extended = self.session_deadline_ms(limits, now_ms) if limits.session_duration is None else 0
+        deadline = int(await HEARTBEAT_SCRIPT(
+            self.redis, keys=[active_sessions_key(user_id)], args=[session_id, now_ms, extended]
+        ))
+        return None if deadline < 0 else deadline
+
+    async def end_session(
+        self,
+        user_id: str,
+        session_id: str,
+        reported_seconds: Optional[int] = None,
+        ended_at_ms: Optional[int] = None,
+    ) -> Optional[SessionEndResult]:
+        """
+        Ends a user's active session and records its duration as usage.
 
-        await self.redis.sadd(f"user_sessions:{user_id}", session_id)
+        The duration billed is measured from the admission time kept in the
+        session record to `ended_at_ms` (default now). A client-reported
+        duration is not trusted for billing, except for sessions admitted before records
+        existed, which have nothing else to go on. Only the call that actually
+        removes the session records usage, so racing or retried ends are
+        counted once.
 
-        # Expire the session after the specified duration
-        await self.redis.expire(f"user_sessions:{user_id}", 3600)
+        Sessions that overran their deadline (and were pruned from the active
+        set by a later admission) are still ended and billed from their record.
 
-    async def end_session(self, user_id: str, session_id: str, duration_seconds: int):
-        """
-        Ends a user's active session and updates their daily usage counter.
+        Returns None if this user has no unended session by that id. The
+        duration only goes to the in-memory usage ledger here; it reaches Redis
+        on the next flush.
 
         Redis Structures:
-            user_sessions:{user_id}               = SET of active session IDs
-            user_daily_usage:{user_id}:{YYYY-MM-DD} = Integer (minutes used today)
+            active_sessions:{user_id}                       = ZSET of session IDs scored by deadline (ms)
+            user_daily_usage_seconds:{user_id}:{YYYY-MM-DD} = Integer (seconds used that day)
+            Session:{session_id}                            = Hash {user_id, tier, started_at (ms)}
         """
+        day = today()
+        stored, started_ms = await END_SESSION_SCRIPT(
+            self.redis,
+            keys=[active_sessions_key(user_id), usage_key(user_id, day), session_record_key(session_id)],
+            args=[session_id, user_id],
+        )
+        stored, started_ms = int(stored), int(started_ms)
+        if stored < 0:
+            return None
 
-        await self.redis.srem(f"user_sessions:{user_id}", session_id)
-
-        # Get today's date for per-day usage tracking
-        today = datetime.utcnow().strftime("%Y-%m-%d")
-        usage_key = f"user_daily_usage:{user_id}:{today}"
+        if started_ms:
+            duration_seconds = max((ended_at_ms or _now_ms()) - started_ms, 0) // 1000
+        else:
+            duration_seconds = max(reported_seconds or 0, 0)
 
-        # Increment usage counter by the number of minutes in this session
-        await self.redis.incrby(usage_key, duration_seconds // 60)
+        self.usage.record(user_id, duration_seconds, day)
+        return SessionEndResult(
+            user_id=user_id,
+            duration_seconds=duration_seconds,
+            usage_today_minutes=(stored + self.usage.pending(user_id, day)) // 60,
+        )
 
-        # Set the daily usage key to expire in 24 hours
-        # Resets the user's daily usage at the start of a new day
-        await self.redis.expire(usage_key, 86400)
+    async def get_session_owner(self, session_id: str) -> Optional[Tuple[str, str]]:
+        """(user_id, tier) of a session that has not been ended yet, or None."""
+        user_id, tier = await self.redis.hmget(session_record_key(session_id), "user_id", "tier")
+        if not user_id:
+            return None
+        return user_id, tier
 
 
-access_control = AccessControlService(redis_client=redis_client)
\ No newline at end of file
+access_control = AccessControlService(
+    redis_client=redis_client, usage=usage_ledger, tiers=tier_catalog
+)
\ No newline at end of file
@@ -1,37 +1,115 @@
+import asyncio
 import json
 import os
 import logging
 from datetime import timedelta
-from contextlib import asynccontextmanager
+from typing import Optional
+import aiohttp
 from livekit import api
 from livekit.api import TwirpError
+from jarvis_shared.metrics import track
 import app.config as config
 
 logger = logging.getLogger(__name__)
 
+# Tries per claim step (room metadata, agent dispatch) before a warm room is given up
+CLAIM_ATTEMPTS = 2
+
 
 class LiveKitService:
     def __init__(self):
         self.api_key = config.LIVEKIT_API_KEY
         self.api_secret = config.LIVEKIT_API_SECRET
         self.livekit_url = config.LIVEKIT_URL
+        self.agent_name = config.LIVEKIT_AGENT_NAME
 
         if not self.api_key or not self.api_secret or not self.livekit_url:
             logger.error("LiveKit configuration is incomplete.")
         else:
             logger.info(f"LiveKit service initialized with URL: {self.livekit_url}")
 
-    @asynccontextmanager
-    async def get_api_client(self):
-        """Async context manager for LiveKit API client"""
-        client = api.LiveKitAPI(
-            url=self.livekit_url, api_key=self.api_key, api_secret=self.api_secret
-        )
+        self.webhook_receiver = api.WebhookReceiver(api.TokenVerifier(self.api_key, self.api_secret))
+        self._client: Optional[api.LiveKitAPI] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._client_lock = asyncio.Lock()
+
+    async def start(self):
+        """Open the shared API client (called from the app lifespan)."""
+        try:
+            await self.get_api_client()
+        except ValueError as e:
+            logger.error(f"LiveKit API client not opened: {e}")
+
+    async def close(self):
+        async with self._client_lock:
+            if self._session is not None:
+                await self._session.close()
+                logger.info("LiveKit API client closed")
+            self._client = None
+            self._session = None
+
+    async def get_api_client(self) -> api.LiveKitAPI:
+        """
+        Return the process-wide LiveKit API client, opening it on first use.
+
+        The client owns one aiohttp session, so Twirp calls reuse warm
+        keep-alive connections instead of a new TLS handshake per request.
+        """
+        client = self._client
+        if client is not None:
+            return client
+        async with self._client_lock:
+            if self._client is None:
+                connector = aiohttp.TCPConnector(
+                    limit=config.LIVEKIT_MAX_CONNECTIONS,
+                    keepalive_timeout=config.LIVEKIT_KEEPALIVE_SECONDS,
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=aiohttp.ClientTimeout(total=config.LIVEKIT_TIMEOUT_SECONDS),
+                )
+                self._client = api.LiveKitAPI(
+                    url=self.livekit_url,
+                    api_key=self.api_key,
+                    api_secret=self.api_secret,
+                    session=self._session,
+                )
+            return self._client
+
+    async def _reconnect(self, stale: api.LiveKitAPI):
+        async with self._client_lock:
+            if self._client is stale:
+                session, self._client, self._session = self._session, None, None
+                try:
+                    await session.close()
+                except Exception:
+                    logger.debug("Error closing stale LiveKit session", exc_info=True)
+        logger.warning("LiveKit connection lost; reopening API client")
+
+    async def _call(self, operation: str, request):
+        """Run `request(client)`, reopening the client and retrying once if the connection dropped."""
+        client = await self.get_api_client()
         try:
-            yield client
-        finally:
-            if hasattr(client, "aclose"):
-                await client.aclose()
+            async with track("livekit", operation):
+                return await request(client)
+        except (aiohttp.ClientConnectionError, RuntimeError) as e:
+            if isinstance(e, RuntimeError) and "Session is closed" not in str(e):
+                raise
+            await self._reconnect(client)
+            async with track("livekit", operation):
+                return await request(await self.get_api_client())
+
+    async def health_check(self) -> bool:
+        """Cheap authenticated round trip over the shared client."""
+        try:
+            await self._call(
+                "ListRooms",
+                lambda client: client.room.list_rooms(api.ListRoomsRequest(names=["__health__"])),
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"LiveKit health check failed: {e}")
+            return False
 
     def generate_token(
         self, room_name: str, participant_id: str, ttl_minutes: int = 60,
@@ -62,22 +140,35 @@ class LiveKitService:
             raise e
 
     async def create_room(
-        self, room_name: str, agent_config: str, max_participants: int = 2, empty_timeout: int = 300
+        self,
+        room_name: str,
+        agent_config: str,
+        max_participants: int = 2,
+        empty_timeout: int = 300,
+        dispatch_agent: bool = True,
     ):
-        """Create a LiveKit room"""
+        """
+        Create a LiveKit room.
+
+        With a named agent (LIVEKIT_AGENT_NAME) the agent is dispatched explicitly,
+        carrying the config; `dispatch_agent=False` creates an idle room for the warm pool.
+        """
         try:
             if not room_name:
                 raise ValueError("Room name is required")
             
-            async with self.get_api_client() as client:
-                req = api.CreateRoomRequest(
-                    name=room_name,
-                    metadata=agent_config,
-                    max_participants=max_participants,
-                    empty_timeout=empty_timeout,
+            req = api.CreateRoomRequest(
+                name=room_name,
+                metadata=agent_config,
+                max_participants=max_participants,
+                empty_timeout=empty_timeout,
+            )
+            if self.agent_name and dispatch_agent:
+                req.agents.append(
+                    api.RoomAgentDispatch(agent_name=self.agent_name, metadata=agent_config)
                 )
-                await client.room.create_room(req)
-                logger.info(f"Room created successfully: {room_name}")
+            await self._call("CreateRoom", lambda client: client.room.create_room(req))
+            logger.info(f"Room created successfully: {room_name}")
         except TwirpError as e:
             if e.code == "already_exists":
                 logger.warning(f"Room '{room_name}' already exists")
@@ -93,15 +184,56 @@ class LiveKitService:
             logger.error(f"Unexpected error creating room '{room_name}': {e}")
             raise e
 
+    async def claim_room(self, room_name: str, agent_config: str):
+        """
+        Attach the agent config to a pre-created room and dispatch the named agent into it.
+
+        A step that fails is retried (the other is not repeated, so the agent is never
+        dispatched twice); the error is raised if it still fails after CLAIM_ATTEMPTS.
+        """
+        steps = {
+            "UpdateRoomMetadata": lambda client: client.room.update_room_metadata(
+                api.UpdateRoomMetadataRequest(room=room_name, metadata=agent_config)
+            ),
+            "CreateDispatch": lambda client: client.agent_dispatch.create_dispatch(
+                api.CreateAgentDispatchRequest(
+                    agent_name=self.agent_name, room=room_name, metadata=agent_config
+                )
+            ),
+        }
+        pending = list(steps)
+        for attempt in range(1, CLAIM_ATTEMPTS + 1):
+            results = await asyncio.gather(
+                *(self._call(operation, steps[operation]) for operation in pending),
+                return_exceptions=True,
+            )
+            failed = [(op, r) for op, r in zip(pending, results) if isinstance(r, Exception)]
+            if not failed:
+                logger.info(f"Room claimed successfully: {room_name}")
+                return
+            pending = [op for op, _ in failed]
+            for operation, e in failed:
+                if isinstance(e, TwirpError):
+                    logger.warning(
+                        f"LiveKit API error claiming room '{room_name}' ({operation}, attempt {attempt}): "
+                        f"{e.code} - {e.message}"
+                    )
+                else:
+                    logger.warning(f"Error claiming room '{room_name}' ({operation}, attempt {attempt}): {e}")
+        logger.error(f"Could not claim room '{room_name}' after {CLAIM_ATTEMPTS} attempts")
+        raise failed[0][1]
+
     async def delete_room(self, room_name: str):
         """Delete a specific room"""
         try:
             if not room_name:
                 raise ValueError("Room name is required")
             
-            async with self.get_api_client() as client:
-                await client.room.delete_room(api.DeleteRoomRequest(room=room_name))
-                logger.info(f"Room deleted successfully: {room_name}")
+            await self._call(
+                "DeleteRoom",
+                lambda client: client.room.delete_room(api.DeleteRoomRequest(room=room_name)),
+            )
+            logger.info(f"Room deleted successfully: {room_name}")
         except TwirpError as e:
             if e.code == "not_found":
                 logger.warning(f"Room '{room_name}' does not exist or was already deleted")
@@ -120,13 +252,15 @@ class LiveKitService:
     async def list_rooms(self):
         """List all rooms"""
         try:
-            async with self.get_api_client() as client:
-                res = await client.room.list_rooms(api.ListRoomsRequest())
-                rooms = [
-                    {"name": r.name, "participants": r.num_participants} for r in res.rooms
-                ]
-                logger.debug(f"Listed {len(rooms)} rooms")
-                return rooms
+            res = await self._call(
+                "ListRooms",
+                lambda client: client.room.list_rooms(api.ListRoomsRequest()),
+            )
+            rooms = [
+                {"name": r.name, "participants": r.num_participants} for r in res.rooms
+            ]
+            logger.debug(f"Listed {len(rooms)} rooms")
+            return rooms
         except TwirpError as e:
             logger.error(f"LiveKit API error listing rooms: {e.code} - {e.message}")
             raise e
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+from uuid import uuid4
+
+from jarvis_shared.metrics import CACHE_REQUESTS
+
+import app.config as config
+from app.services.livekit import LiveKitService, livekit_service
+
+logger = logging.getLogger(__name__)
+
+# Don't hand out rooms this close to LiveKit closing them for being empty
+CLAIM_MARGIN_SECONDS = 30
+
+
+@dataclass
+class PooledRoom:
+    name: str
+    warm: bool  # pre-created by the pool, rather than to be created on demand
+    created_at: float = 0.0
+
+
+class RoomPool:
+    """
+    Keeps a few empty LiveKit rooms ready so session creation only has to
+    attach the agent config, instead of waiting on a CreateRoom call.
+
+    Rooms are created without an agent and with `empty_timeout` equal to the
+    pool TTL, so LiveKit closes any the pool never hands out. Refills happen
+    in a background task; when the pool is empty, sessions fall back to
+    creating their room synchronously.
+    """
+
+    def __init__(self, livekit: LiveKitService, target_size: int, ttl_seconds: int, refill_interval: float):
+        self.livekit = livekit
+        self.target_size = target_size
+        self.ttl_seconds = ttl_seconds
+        self.refill_interval = refill_interval
+        self._rooms: Deque[PooledRoom] = deque()
+        self._refill = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.warm_claims = 0
+        self.cold_claims = 0
+        self.last_claim_ms: Optional[float] = None
+        self._claim_ms_total = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.target_size > 0 and bool(self.livekit.agent_name)
+
+    def _is_fresh(self, room: PooledRoom) -> bool:
+        return time.monotonic() - room.created_at < self.ttl_seconds - CLAIM_MARGIN_SECONDS
+
+    def checkout(self) -> PooledRoom:
+        """Take a warm room if one is ready, otherwise reserve a name for on-demand creation."""
+        while self._rooms:
+            room = self._rooms.popleft()
+            if self._is_fresh(room):
+                self._refill.set()
+                return room
+        self._refill.set()
+        return PooledRoom(name=str(uuid4()), warm=False)
+
+    def checkin(self, room: PooledRoom):
+        """Return a room that was checked out but never activated."""
+        if room.warm and self._is_fresh(room):
+            self._rooms.appendleft(room)
+
+    async def activate(self, room: PooledRoom, agent_config: str):
+        """
+        Attach the agent config to a warm room, or create the room now if it is not warm.
+
+        A warm room that cannot be claimed (after LiveKitService's retries) is not
+        recreated under the same name, since CreateRoom on a room that still exists
+        is a no-op that dispatches no agent; the error propagates and the caller
+        drops the room.
+        """
+        start = time.perf_counter()
+        if room.warm:
+            await self.livekit.claim_room(room.name, agent_config)
+            self.warm_claims += 1
+            CACHE_REQUESTS.labels("room_pool", "hit").inc()
+        else:
+            await self.livekit.create_room(room.name, agent_config)
+            self.cold_claims += 1
+            CACHE_REQUESTS.labels("room_pool", "miss").inc()
+
+        self.last_claim_ms = (time.perf_counter() - start) * 1000
+        self._claim_ms_total += self.last_claim_ms
+
+    async def _create_pooled_room(self):
+        room = PooledRoom(name=str(uuid4()), warm=True, created_at=time.monotonic())
+        await self.livekit.create_room(
+            room.name, "", empty_timeout=self.ttl_seconds, dispatch_agent=False
+        )
+        self._rooms.append(room)
+
+    async def _fill(self):
+        while self._rooms and not self._is_fresh(self._rooms[0]):
+            self._rooms.popleft()  # LiveKit closes it via empty_timeout
+        missing = self.target_size - len(self._rooms)
+        if missing > 0:
+            results = await asyncio.gather(
+                *(self._create_pooled_room() for _ in range(missing)), return_exceptions=True
+            )
+            failed = [r for r in results if isinstance(r, Exception)]
+            if failed:
+                logger.warning(f"Room pool refill: {len(failed)}/{missing} rooms failed: {failed[0]}")
+
+    async def _run(self):
+        while True:
+            self._refill.clear()
+            try:
+                await self._fill()
+            except Exception as e:
+                logger.warning(f"Room pool refill failed: {e}")
+            try:
+                await asyncio.wait_for(self._refill.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self.target_size > 0 and not self.livekit.agent_name:
+            logger.error("ROOM_POOL_SIZE is set but LIVEKIT_AGENT_NAME is not; room pool disabled")
+            return
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Room pool started (target={self.target_size}, ttl={self.ttl_seconds}s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        rooms, self._rooms = list(self._rooms), deque()
+        await asyncio.gather(
+            *(self.livekit.delete_room(r.name) for r in rooms), return_exceptions=True
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        claims = self.warm_claims + self.cold_claims
+        return {
+            "enabled": self.enabled,
+            "depth": len(self._rooms),
+            "target_size": self.target_size,
+            "warm_claims": self.warm_claims,
+            "cold_claims": self.cold_claims,
+            "last_claim_ms": self.last_claim_ms,
+            "avg_claim_ms": round(self._claim_ms_total / claims, 2) if claims else None,
+        }
+
+
+room_pool = RoomPool(
+    livekit=livekit_service,
+    target_size=config.ROOM_POOL_SIZE,
+    ttl_seconds=config.ROOM_POOL_TTL_SECONDS,
+    refill_interval=config.ROOM_POOL_REFILL_INTERVAL,
+)
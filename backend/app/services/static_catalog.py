@@ -0,0 +1,63 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+from jarvis_shared.metrics import CACHE_REQUESTS
+
+# Responses differ by login state, so shared caches must not store them and
+# browsers revalidate each time; a matching ETag makes that a bodiless 304.
+CACHE_CONTROL = "private, no-cache"
+VARY = "Cookie"
+
+
+@dataclass(frozen=True)
+class CatalogPayload:
+    body: bytes
+    etag: str
+
+
+def build_payload(items: List[BaseModel]) -> CatalogPayload:
+    body = json.dumps(
+        [item.model_dump(mode="json") for item in items], separators=(",", ":"), ensure_ascii=False
+    ).encode()
+    return CatalogPayload(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class StaticCatalog:
+    """
+    A catalog list serialized once, with a guest variant that only keeps
+    entries marked `available_on_guest`.
+    """
+
+    def __init__(self, name: str, items: List[BaseModel]):
+        self.name = name
+        self._variants: Dict[str, CatalogPayload] = {
+            "guest": build_payload([item for item in items if item.available_on_guest]),
+            "full": build_payload(items),
+        }
+
+    def payload(self, tier: str) -> CatalogPayload:
+        return self._variants["guest" if tier == "guest" else "full"]
+
+    def respond(self, request: Request, tier: str) -> Response:
+        payload = self.payload(tier)
+        headers = {"ETag": payload.etag, "Cache-Control": CACHE_CONTROL, "Vary": VARY}
+        if etag_matches(request.headers.get("if-none-match"), payload.etag):
+            CACHE_REQUESTS.labels(f"{self.name}_etag", "hit").inc()
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        CACHE_REQUESTS.labels(f"{self.name}_etag", "miss").inc()
+        return Response(content=payload.body, media_type="application/json", headers=headers)
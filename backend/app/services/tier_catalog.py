@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+import asyncpg
+
+import app.config as config
+from app.db.connection import get_db_connection
+from app.db.tiers import TIERS_CHANNEL, list_tiers
+from app.schemas.access_control import TierLimits
+
+logger = logging.getLogger(__name__)
+
+LISTEN_RETRY_SECONDS = 5
+
+# Used until the first load succeeds; rows in the tiers table override these by id.
+BUILTIN_TIERS = {
+    "guest": TierLimits(
+        name="Guest",
+        session_duration=600,  # 10 min # TODO make this 2-3 min after testing
+        concurrent_sessions=50, # TODO make this 1 after testing
+        daily_limit=2,  # 2 min/day
+        features=["basic_voice_chat"],
+    ),
+    "free": TierLimits(
+        name="Free",
+        session_duration=None,  # Unlimited per session
+        concurrent_sessions=50, #TODO make this 2 after testing
+        daily_limit=600,  # 10 min/day
+        features=["voice_chat", "long_sessions"],
+    ),
+}
+
+
+def tier_from_row(row: dict) -> TierLimits:
+    return TierLimits(
+        name=row["name"],
+        session_duration=row.get("session_duration_seconds"),
+        concurrent_sessions=row["max_concurrent_sessions"],
+        daily_limit=row.get("daily_minutes"),
+        features=list(row.get("features") or []),
+    )
+
+
+class TierCatalog:
+    """
+    In-memory snapshot of the tiers table.
+
+    Readers get the current snapshot without locks or queries; a refresh
+    builds a new read-only mapping and swaps the reference. Refreshes run
+    every `refresh_interval` seconds and whenever Postgres sends a
+    `tiers_changed` notification, which the trigger from
+    migrations/002_tiers_catalog.sql emits.
+    """
+
+    def __init__(self, defaults: Mapping[str, TierLimits], refresh_interval: float):
+        self.defaults = dict(defaults)
+        self.refresh_interval = refresh_interval
+        self._snapshot: Mapping[str, TierLimits] = MappingProxyType(dict(self.defaults))
+        self._changed = asyncio.Event()
+        self._tasks: list = []
+        self.loaded_at: Optional[float] = None
+
+    def get(self, tier_id: str) -> Optional[TierLimits]:
+        return self._snapshot.get(tier_id)
+
+    def snapshot(self) -> Mapping[str, TierLimits]:
+        return self._snapshot
+
+    async def refresh(self):
+        async with get_db_connection() as conn:
+            rows = await list_tiers(conn)
+        tiers = dict(self.defaults)
+        for row in rows:
+            try:
+                tiers[row["id"]] = tier_from_row(row)
+            except Exception as e:
+                logger.error(f"Skipping invalid tier row {row.get('id')}: {e}")
+        self._snapshot = MappingProxyType(tiers)
+        self.loaded_at = time.time()
+        logger.info(f"Tier catalog loaded: {sorted(tiers)}")
+
+    def _on_notify(self, conn, pid, channel, payload):
+        self._changed.set()
+
+    async def _listen(self):
+        """Hold a dedicated LISTEN connection, reconnecting if it drops."""
+        while True:
+            lost = asyncio.Event()
+            conn = None
+            try:
+                conn = await asyncpg.connect(config.DATABASE_URL)
+                conn.add_termination_listener(lambda _: lost.set())
+                await conn.add_listener(TIERS_CHANNEL, self._on_notify)
+                self._changed.set()  # catch up on anything missed while disconnected
+                await lost.wait()
+                logger.warning("Tier catalog LISTEN connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Tier catalog LISTEN failed: {e}")
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(LISTEN_RETRY_SECONDS)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Tier catalog refresh failed, keeping previous snapshot: {e}")
+
+    async def start(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Could not load tiers from Postgres, using built-in tiers: {e}")
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run()), asyncio.create_task(self._listen())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+tier_catalog = TierCatalog(defaults=BUILTIN_TIERS, refresh_interval=config.TIER_REFRESH_INTERVAL)
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+
+import app.config as config
+from app.db.connection import get_db_connection
+from app.db.usage import add_usage
+from app.services.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+USAGE_KEY = "user_daily_usage_seconds:{user_id}:{day}"
+USAGE_KEY_TTL = 2 * 86400  # outlives the day it counts; history lives in Postgres
+
+
+def usage_key(user_id: str, day: str) -> str:
+    return USAGE_KEY.format(user_id=user_id, day=day)
+
+
+def today() -> str:
+    return datetime.utcnow().strftime("%Y-%m-%d")
+
+
+class UsageLedger:
+    """
+    Write-behind accumulator for per-user, per-day session seconds.
+
+    Ending a session only adds to an in-memory counter. A background task
+    flushes the counters to Redis (pipelined INCRBY, read by admission checks)
+    every few seconds, and appends them to the `usage_daily` table in
+    Postgres on a slower cadence. Failed writes are merged back and retried;
+    everything still pending is written on shutdown.
+    """
+
+    def __init__(self, redis, flush_interval: float, persist_interval: float):
+        self.redis = redis
+        self.flush_interval = flush_interval
+        self.persist_interval = persist_interval
+        self._pending: Dict[Tuple[str, str], int] = defaultdict(int)  # not yet in Redis
+        self._unpersisted: Dict[Tuple[str, str], int] = defaultdict(int)  # not yet in Postgres
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, user_id: str, seconds: int, day: Optional[str] = None):
+        if seconds > 0:
+            self._pending[(user_id, day or today())] += seconds
+
+    def pending(self, user_id: str, day: Optional[str] = None) -> int:
+        """Seconds recorded in this process that Redis has not seen yet."""
+        return self._pending.get((user_id, day or today()), 0)
+
+    @staticmethod
+    def _merge(into: Dict[Tuple[str, str], int], batch: Dict[Tuple[str, str], int]):
+        for key, seconds in batch.items():
+            into[key] += seconds
+
+    async def flush(self):
+        """Push pending counters to Redis in one pipeline."""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, defaultdict(int)
+        try:
+            pipe = self.redis.pipeline()
+            for (user_id, day), seconds in batch.items():
+                key = usage_key(user_id, day)
+                pipe.incrby(key, seconds)
+                pipe.expire(key, USAGE_KEY_TTL)
+            await pipe.exec()
+        except BaseException:
+            self._merge(self._pending, batch)
+            raise
+        self._merge(self._unpersisted, batch)
+
+    async def persist(self):
+        """Append flushed counters to the Postgres usage history."""
+        if not self._unpersisted:
+            return
+        batch, self._unpersisted = self._unpersisted, defaultdict(int)
+        try:
+            async with get_db_connection() as conn:
+                await add_usage(
+                    conn,
+                    [(user_id, date.fromisoformat(day), seconds) for (user_id, day), seconds in batch.items()],
+                )
+        except BaseException:
+            self._merge(self._unpersisted, batch)
+            raise
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_persist = loop.time() + self.persist_interval
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Usage flush to Redis failed, will retry: {e}")
+            if loop.time() >= next_persist:
+                next_persist = loop.time() + self.persist_interval
+                try:
+                    await self.persist()
+                except Exception as e:
+                    logger.warning(f"Usage persist to Postgres failed, will retry: {e}")
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and write out everything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            # Keep the history even if Redis never sees these seconds
+            logger.error(f"Final usage flush to Redis failed: {e}")
+            self._merge(self._unpersisted, self._pending)
+            self._pending.clear()
+        try:
+            await self.persist()
+        except Exception as e:
+            logger.error(f"Final usage persist to Postgres failed: {e}")
+        if self._pending or self._unpersisted:
+            logger.error(
+                f"Usage lost on shutdown: {dict(self._pending)} (Redis), {dict(self._unpersisted)} (Postgres)"
+            )
+
+
+usage_ledger = UsageLedger(
+    redis=redis_client,
+    flush_interval=config.USAGE_FLUSH_INTERVAL,
+    persist_interval=config.USAGE_PERSIST_INTERVAL,
+)
@@ -0,0 +1,106 @@
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from jarvis_shared.metrics import CACHE_REQUESTS
+
+import app.config as config
+from app.db.connection import get_db_connection
+from app.db.users import get_or_create_user, get_user_by_id
+from app.services.redis_client import redis_client
+from app.services.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+USER_KEY = "user:{user_id}"
+
+
+def _encode(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class UserCache:
+    """
+    Read-through cache for rows of the users table, keyed by id.
+
+    Lookups go to the per-process LRU first, then (if enabled) to Redis,
+    which every replica shares, and only then to Postgres. The only write to
+    users is the login upsert in get_or_create, which replaces both layers
+    with the row Postgres returned. The local layer has a short TTL, which
+    bounds how long a replica keeps serving a row another replica has since
+    rewritten.
+    """
+
+    def __init__(self, redis, maxsize: int, ttl_seconds: float, shared_ttl_seconds: int, shared: bool):
+        self.redis = redis
+        self.shared = shared
+        self.shared_ttl_seconds = shared_ttl_seconds
+        self._by_id = TTLCache(maxsize, ttl_seconds)
+        self.db_reads = 0
+
+    def _store_local(self, user: Dict[str, Any]):
+        self._by_id.set(str(user["id"]), user)
+
+    async def _store_shared(self, user: Dict[str, Any]):
+        await self.redis.set(
+            USER_KEY.format(user_id=user["id"]), json.dumps(user, default=_encode), ex=self.shared_ttl_seconds
+        )
+
+    async def _store(self, user: Dict[str, Any]):
+        self._store_local(user)
+        if self.shared:
+            try:
+                await self._store_shared(user)
+            except Exception as e:
+                logger.warning(f"Could not cache user {user['id']} in Redis: {e}")
+
+    async def _get_shared(self, user_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = await self.redis.get(USER_KEY.format(user_id=user_id))
+        except Exception as e:
+            logger.warning(f"User cache Redis read failed: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    async def get_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        user = self._by_id.get(user_id)
+        if user is not None:
+            CACHE_REQUESTS.labels("user_profile", "hit").inc()
+            return dict(user)
+
+        if self.shared:
+            user = await self._get_shared(user_id)
+            if user is not None:
+                CACHE_REQUESTS.labels("user_profile", "shared_hit").inc()
+                self._store_local(user)
+                return dict(user)
+
+        CACHE_REQUESTS.labels("user_profile", "miss").inc()
+        self.db_reads += 1
+        async with get_db_connection() as conn:
+            user = await get_user_by_id(conn, user_id)
+        if user is not None:
+            await self._store(user)
+        return user
+
+    async def get_or_create(self, email: str, name: str, picture: str) -> Dict[str, Any]:
+        """Upsert the user on login and refresh both cache layers with the result."""
+        async with get_db_connection() as conn:
+            user = await get_or_create_user(conn, email, name, picture)
+        await self._store(user)
+        return dict(user)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"local": self._by_id.stats(), "shared": self.shared, "db_reads": self.db_reads}
+
+
+user_cache = UserCache(
+    redis=redis_client,
+    maxsize=config.USER_CACHE_SIZE,
+    ttl_seconds=config.USER_CACHE_TTL,
+    shared_ttl_seconds=config.USER_CACHE_SHARED_TTL,
+    shared=config.USER_CACHE_SHARED,
+)
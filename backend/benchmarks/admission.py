@@ -0,0 +1,89 @@
+"""
+Session admission latency: the old sequential Redis calls vs the single admission script.
+
+Runs against a local redis-server over RESP (`--backend native`), or an
+Upstash-compatible REST endpoint such as serverless-redis-http in front of it:
+
+    docker run -d -p 6379:6379 redis
+    docker run -d -p 8079:80 -e SRH_MODE=env -e SRH_TOKEN=example_token \\
+        -e SRH_CONNECTION_STRING="redis://host.docker.internal:6379" hiett/serverless-redis-http
+    cd backend
+    uv run python -m benchmarks.admission --backend native --url redis://localhost:6379
+    uv run python -m benchmarks.admission --url http://localhost:8079 --token example_token
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+from jarvis_shared.redis_client import NativeRedis
+from upstash_redis.asyncio import Redis
+
+from app.services.access_control import AccessControlService, active_sessions_key
+from app.services.tier_catalog import tier_catalog
+from app.services.usage_ledger import UsageLedger
+
+
+async def legacy_admission(redis, service: AccessControlService, user_id: str, tier: str, agent_config: str):
+    """The pre-script request path: check_permission, start_session, setex, then two usage reads."""
+    limits = service.get_limits(tier)
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    usage_key = f"user_daily_usage:{user_id}:{today}"
+    session_id = str(uuid.uuid4())
+
+    active = await redis.scard(f"user_sessions:{user_id}") or 0
+    if active >= limits.concurrent_sessions:
+        return
+    usage = int(await redis.get(usage_key) or 0)
+    if limits.daily_limit is not None and usage >= limits.daily_limit:
+        return
+    await redis.sadd(f"user_sessions:{user_id}", session_id)
+    await redis.expire(f"user_sessions:{user_id}", 3600)
+    await redis.setex(f"Agent-Config:{session_id}", 1800, agent_config)
+    int(await redis.get(usage_key) or 0)
+    int(await redis.get(usage_key) or 0)
+
+
+async def script_admission(redis, service: AccessControlService, user_id: str, tier: str, agent_config: str):
+    await service.admit_session(user_id, tier, str(uuid.uuid4()), agent_config)
+
+
+def _report(label: str, latencies: list):
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(f"{label:<10} p50 {p(0.50):7.2f} ms | p99 {p(0.99):7.2f} ms | mean {statistics.fmean(latencies) * 1000:7.2f} ms")
+
+
+async def main(backend: str, url: str, token: str, total: int):
+    redis = NativeRedis(url) if backend == "native" else Redis(url=url, token=token)
+    service = AccessControlService(redis_client=redis, usage=UsageLedger(redis, 5, 60), tiers=tier_catalog)
+    agent_config = json.dumps({"model_id": "google/gemini-2.5-flash", "voice": {}})
+    user_ids = [f"bench_{uuid.uuid4().hex[:8]}_{i}" for i in range(total)]
+
+    try:
+        for label, admit in (("sequential", legacy_admission), ("script", script_admission)):
+            latencies = []
+            for user_id in user_ids:
+                start = time.perf_counter()
+                await admit(redis, service, user_id, "free", agent_config)
+                latencies.append(time.perf_counter() - start)
+            _report(label, latencies)
+            await redis.delete(
+                *[f"user_sessions:{u}" for u in user_ids],
+                *[active_sessions_key(u) for u in user_ids],
+            )
+    finally:
+        await redis.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=["upstash", "native"], default="upstash")
+    parser.add_argument("--url", default="http://localhost:8079")
+    parser.add_argument("--token", default="example_token")
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.backend, args.url, args.token, args.requests))
@@ -0,0 +1,63 @@
+"""
+Per-response serialization cost: JSONResponse vs FastJSONResponse vs model_dump_json.
+
+Measures only rendering of already-built payloads (what FastAPI does after the
+handler returns). Install orjson to see the fast path; without it
+FastJSONResponse falls back to the stdlib encoder.
+
+    cd backend
+    uv run --extra fast-json python -m benchmarks.json_responses
+"""
+import argparse
+import timeit
+import uuid
+
+from fastapi.responses import JSONResponse
+from jarvis_shared import json_response
+from jarvis_shared.json_response import FastJSONResponse
+
+from app.model_config import get_all_models
+from app.schemas.sessions import CreateSessionResponse
+from app.voice_config import get_all_voices
+
+
+def _payloads():
+    session = CreateSessionResponse(
+        session_id=uuid.uuid4(),
+        tier="free",
+        features=["voice_chat", "long_sessions"],
+        max_session_duration_seconds=None,
+        usage_today_minutes=3,
+        remaining_today_minutes=597,
+        livekit_url="wss://example.livekit.cloud",
+        livekit_token="x" * 400,
+        ip="127.0.0.1",
+        user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+    )
+    catalog = [*get_all_voices(), *get_all_models()]
+    return {
+        "CreateSessionResponse": (session, session.model_dump(mode="json")),
+        "voice+model catalog": (catalog, [item.model_dump(mode="json") for item in catalog]),
+    }
+
+
+def main(number: int):
+    print(f"orjson installed: {json_response.orjson is not None}")
+    for name, (model, content) in _payloads().items():
+        timings = {
+            "JSONResponse": lambda: JSONResponse(content),
+            "FastJSONResponse": lambda: FastJSONResponse(content),
+        }
+        if not isinstance(model, list):
+            timings["model_dump_json"] = lambda: model.model_dump_json()
+        print(name)
+        for label, fn in timings.items():
+            per_call = min(timeit.repeat(fn, number=number, repeat=5)) / number
+            print(f"  {label:<18} {per_call * 1e6:8.2f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.number)
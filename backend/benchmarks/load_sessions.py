@@ -0,0 +1,296 @@
+"""
+Offline load test: POST /sessions -> DELETE /sessions/{id} cycles against main.app.
+
+Everything downstream is an in-process fake with injected latency (a base
+delay plus an exponential tail), so it runs on a laptop with no network:
+
+- Redis: fakeredis (with Lua) behind the same NativeRedis adapter the app
+  uses for REDIS_BACKEND=native; each command or pipeline costs one delay.
+- LiveKit: a stand-in for the Twirp room/agent-dispatch clients.
+- Postgres: a stand-in pool/connection for the tier catalog and usage ledger.
+
+The app runs with its real lifespan, middleware and routes, driven through
+httpx's ASGI transport. Reports throughput, p50/p95/p99 per step and the
+downstream calls each cycle made, as a baseline to regress against. App
+logging is raised to WARNING (--log-level) so per-request lines do not
+dominate the timings.
+
+The session endpoints never query Postgres: the user and tier come from the
+access token, tier limits from the in-memory catalog, and usage is written
+behind by the ledger every USAGE_PERSIST_INTERVAL. Sessions here last well
+under a second, so they bill no usage and the postgres column stays near
+zero whatever --users is: it counts the tier catalog's reload once its LISTEN
+connection is up, plus any ledger persist that lands mid-run.
+
+    cd backend
+    uv run --group dev python -m benchmarks.load_sessions --cycles 2000 --concurrency 50
+"""
+import os
+
+# Must be set before the app (and its config) is imported
+os.environ.update({
+    "REDIS_BACKEND": "native",
+    "REDIS_URL": "redis://load-test.invalid:6379",
+    "RATE_LIMIT_ENABLED": os.getenv("RATE_LIMIT_ENABLED", "false"),
+})
+for key, value in {
+    "JWT_SECRET_KEY": "load-test-secret",
+    "SESSION_SECRET_KEY": "load-test-session-secret",
+    "LIVEKIT_API_KEY": "load-test",
+    "LIVEKIT_API_SECRET": "load-test-secret-load-test-secret-load-test",
+    "LIVEKIT_URL": "wss://load-test.livekit.invalid",
+}.items():
+    os.environ.setdefault(key, value)
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import fakeredis
+import httpx
+from jarvis_shared.redis_client import NativeRedis
+
+import app.db.connection as db_connection
+import app.services.tier_catalog as tier_catalog_module
+from app.auth.jwt_manager import jwt_manager
+from app.services.livekit import livekit_service
+from app.services.redis_client import redis_client
+from main import app
+
+calls: Counter = Counter()
+
+# Anything else means the run measured an error path, so it fails instead of reporting
+EXPECTED_STATUSES = {"POST 201", "DELETE 202"}
+if os.environ["RATE_LIMIT_ENABLED"].lower() == "true":
+    EXPECTED_STATUSES.add("POST 429")
+
+
+class Latency:
+    def __init__(self, base_ms: float):
+        self.base_ms = base_ms
+
+    async def wait(self):
+        if self.base_ms > 0:
+            await asyncio.sleep((self.base_ms + random.expovariate(1 / (self.base_ms * 0.25))) / 1000)
+
+
+class FakeRedisPipeline:
+    def __init__(self, pipeline, latency: Latency):
+        self._pipeline = pipeline
+        self._latency = latency
+
+    def __getattr__(self, name):
+        return getattr(self._pipeline, name)
+
+    async def execute(self):
+        calls["redis"] += 1
+        await self._latency.wait()
+        return await self._pipeline.execute()
+
+
+class FakeRedisServer:
+    """fakeredis with one injected round trip per command or pipeline."""
+
+    def __init__(self, latency: Latency):
+        self._redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        self._latency = latency
+
+    def pipeline(self, transaction: bool = True):
+        return FakeRedisPipeline(self._redis.pipeline(transaction=transaction), self._latency)
+
+    async def aclose(self):
+        await self._redis.aclose()
+
+    def __getattr__(self, name):
+        command = getattr(self._redis, name)
+
+        async def call(*args, **kwargs):
+            calls["redis"] += 1
+            await self._latency.wait()
+            return await command(*args, **kwargs)
+
+        return call
+
+
+class FakeTwirpService:
+    def __init__(self, latency: Latency, responses=None):
+        self._latency = latency
+        self._responses = responses or {}
+
+    def __getattr__(self, name):
+        async def call(request):
+            calls["livekit"] += 1
+            await self._latency.wait()
+            return self._responses.get(name)
+
+        return call
+
+
+class FakeLiveKitAPI:
+    def __init__(self, latency: Latency):
+        self.room = FakeTwirpService(latency, {"list_rooms": SimpleNamespace(rooms=[])})
+        self.agent_dispatch = FakeTwirpService(latency)
+
+
+class FakePostgresConnection:
+    def __init__(self, latency: Latency):
+        self._latency = latency
+
+    async def _query(self, result=None):
+        calls["postgres"] += 1
+        await self._latency.wait()
+        return result
+
+    async def execute(self, *args, **kwargs):
+        return await self._query("OK")
+
+    async def executemany(self, *args, **kwargs):
+        return await self._query()
+
+    async def fetch(self, *args, **kwargs):
+        return await self._query([])
+
+    async def fetchrow(self, *args, **kwargs):
+        return await self._query()
+
+    def transaction(self):
+        @asynccontextmanager
+        async def transaction():
+            yield
+
+        return transaction()
+
+    # LISTEN connection used by the tier catalog
+    async def add_listener(self, *args):
+        pass
+
+    def add_termination_listener(self, *args):
+        pass
+
+    def is_closed(self) -> bool:
+        return False
+
+    async def close(self):
+        pass
+
+
+class FakePostgresPool:
+    def __init__(self, latency: Latency):
+        self._latency = latency
+
+    def acquire(self):
+        @asynccontextmanager
+        async def acquire():
+            yield FakePostgresConnection(self._latency)
+
+        return acquire()
+
+    async def close(self):
+        pass
+
+
+def install_fakes(redis_ms: float, livekit_ms: float, postgres_ms: float):
+    native = NativeRedis(os.environ["REDIS_URL"])
+    native._target = FakeRedisServer(Latency(redis_ms))
+    redis_client._client = native
+
+    livekit_service._client = FakeLiveKitAPI(Latency(livekit_ms))
+
+    db_connection._pool = FakePostgresPool(Latency(postgres_ms))
+
+    async def connect(*args, **kwargs):
+        return FakePostgresConnection(Latency(postgres_ms))
+
+    tier_catalog_module.asyncpg = SimpleNamespace(connect=connect)
+
+
+def _percentiles(latencies: list) -> str:
+    latencies = sorted(latencies)
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    return f"p50 {p(0.50):7.2f} | p95 {p(0.95):7.2f} | p99 {p(0.99):7.2f} ms"
+
+
+async def run(cycles: int, concurrency: int, users: int):
+    tokens = [
+        jwt_manager.create_access_token(
+            {"id": f"load_{uuid.uuid4().hex[:8]}", "email": f"load{i}@example.com", "name": f"Load {i}", "tier_id": "free"}
+        )
+        for i in range(users)
+    ]
+    create_latencies, end_latencies, cycle_latencies = [], [], []
+    statuses: Counter = Counter()
+    sem = asyncio.Semaphore(concurrency)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+
+        async def cycle(i: int):
+            headers = {"Cookie": f"access_token={tokens[i % users]}"}
+            async with sem:
+                start = time.perf_counter()
+                created = await client.post("/sessions", json={}, headers=headers)
+                created_at = time.perf_counter()
+                statuses[f"POST {created.status_code}"] += 1
+                if created.status_code != 201:
+                    return
+                create_latencies.append(created_at - start)
+
+                session_id = created.json()["session_id"]
+                ended = await client.request(
+                    "DELETE", f"/sessions/{session_id}", json={"duration_seconds": 1}, headers=headers
+                )
+                done = time.perf_counter()
+                statuses[f"DELETE {ended.status_code}"] += 1
+                if ended.status_code == 202:
+                    end_latencies.append(done - created_at)
+                    cycle_latencies.append(done - start)
+
+        calls.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(cycle(i) for i in range(cycles)))
+        elapsed = time.perf_counter() - started
+
+    completed = len(cycle_latencies)
+    print(f"cycles: {completed}/{cycles} in {elapsed:.2f}s -> {completed / elapsed:.1f} cycles/s")
+    print(f"statuses: {dict(sorted(statuses.items()))}")
+    if completed:
+        print(f"create  {_percentiles(create_latencies)}")
+        print(f"end     {_percentiles(end_latencies)}")
+        print(f"cycle   {_percentiles(cycle_latencies)} | mean {statistics.fmean(cycle_latencies) * 1000:7.2f} ms")
+        per_cycle = ", ".join(f"{dep} {calls[dep] / completed:.2f}" for dep in ("redis", "livekit", "postgres"))
+        print(f"downstream calls per cycle: {per_cycle}")
+
+    unexpected = {status: count for status, count in statuses.items() if status not in EXPECTED_STATUSES}
+    if unexpected or not completed:
+        raise SystemExit(f"load test failed: unexpected responses {unexpected or dict(statuses)}")
+
+
+async def main(args):
+    logging.getLogger().setLevel(args.log_level)
+    install_fakes(args.redis_ms, args.livekit_ms, args.postgres_ms)
+    print(
+        f"{args.cycles} cycles, concurrency {args.concurrency}, {args.users} users | "
+        f"redis ~{args.redis_ms}ms, livekit ~{args.livekit_ms}ms, postgres ~{args.postgres_ms}ms"
+    )
+    async with app.router.lifespan_context(app):
+        calls.clear()  # startup traffic is not part of the measurement
+        await run(args.cycles, args.concurrency, args.users)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=200, help="distinct signed-in users to spread sessions over")
+    parser.add_argument("--redis-ms", type=float, default=5)
+    parser.add_argument("--livekit-ms", type=float, default=40)
+    parser.add_argument("--postgres-ms", type=float, default=3)
+    parser.add_argument("--log-level", default="WARNING", help="level for the app's logging during the run")
+    asyncio.run(main(parser.parse_args()))
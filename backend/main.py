@@ -1,12 +1,25 @@
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
+from jarvis_shared.json_response import FastJSONResponse
+from jarvis_shared.metrics import MetricsMiddleware, metrics_response
+from jarvis_shared.profiling import ProfileStore, ProfilingMiddleware, profiles_router, profiling_available
 
 from app.routes.sessions import router as sessions_router
 from app.routes.auth import router as auth_router
 from app.routes.voice import router as voice_router
 from app.routes.dev import router as dev_router
+from app.routes.webhooks import router as webhooks_router
+from app.db.connection import init_db_pool, close_db_pool
+from app.auth.redis_sessions import revocation_filter
+from app.services.redis_client import redis_client
+from app.services.livekit import livekit_service
+from app.services.room_pool import room_pool
+from app.services.tier_catalog import tier_catalog
+from app.services.usage_ledger import usage_ledger
+import app.config as config
 import logging
 
 logging.basicConfig(
@@ -15,9 +28,45 @@ logging.basicConfig(
 )
 
 
-app = FastAPI(title="Jarvis Voice AI Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db_pool()
+    await tier_catalog.start()
+    await usage_ledger.start()
+    revocation_filter.start()
+    await livekit_service.start()
+    room_pool.start()
+    try:
+        yield
+    finally:
+        await room_pool.stop()
+        await livekit_service.close()
+        await revocation_filter.stop()
+        await usage_ledger.stop()
+        await tier_catalog.stop()
+        await close_db_pool()
+        await redis_client.close()
 
 
+app = FastAPI(
+    title="Jarvis Voice AI Backend",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+
+
+profile_store = ProfileStore(config.PROFILING_DIR, config.PROFILING_MAX_PROFILES)
+if config.PROFILING_TOKEN or config.PROFILING_SAMPLE_RATE > 0:
+    if profiling_available():
+        app.add_middleware(
+            ProfilingMiddleware,
+            store=profile_store,
+            token=config.PROFILING_TOKEN,
+            sample_rate=config.PROFILING_SAMPLE_RATE,
+        )
+    else:
+        logging.getLogger(__name__).warning("Profiling is configured but pyinstrument is not installed")
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -31,12 +80,22 @@ app.add_middleware(
     secret_key=os.getenv("SESSION_SECRET_KEY")
 )
 
+app.add_middleware(MetricsMiddleware)
+
 
 @app.get("/")
 def read_root():
     return {"JARVIS": "Just A Rather Very Intelligent System"}
 
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    return metrics_response()
+
 app.include_router(auth_router)
 app.include_router(sessions_router)
 app.include_router(voice_router)
 app.include_router(dev_router)
+app.include_router(profiles_router(profile_store, config.PROFILING_TOKEN))
+app.include_router(webhooks_router)
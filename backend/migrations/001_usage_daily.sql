@@ -0,0 +1,8 @@
+-- Daily usage history written by the usage ledger (app/services/usage_ledger.py)
+CREATE TABLE IF NOT EXISTS usage_daily (
+    user_id TEXT NOT NULL,
+    day DATE NOT NULL,
+    seconds BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (user_id, day)
+);
@@ -0,0 +1,16 @@
+-- Optional limit columns read by the tier catalog (app/services/tier_catalog.py),
+-- and a statement-level trigger that NOTIFYs every listening backend whenever the
+-- tiers table changes. The channel name matches TIERS_CHANNEL in app/db/tiers.py.
+ALTER TABLE tiers ADD COLUMN IF NOT EXISTS session_duration_seconds INTEGER;
+ALTER TABLE tiers ADD COLUMN IF NOT EXISTS features TEXT[] NOT NULL DEFAULT '{}';
+
+CREATE OR REPLACE FUNCTION notify_tiers_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('tiers_changed', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tiers_changed ON tiers;
+CREATE TRIGGER tiers_changed AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON tiers
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_tiers_changed();
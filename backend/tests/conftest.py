@@ -0,0 +1,24 @@
+import os
+
+# Must be set before the app (and its config) is imported
+os.environ.update({
+    "REDIS_BACKEND": "native",
+    "REDIS_URL": "redis://test.invalid:6379",
+    "JWT_SECRET_KEY": "test-secret",
+    "LIVEKIT_API_KEY": "test",
+    "LIVEKIT_API_SECRET": "test-secret-test-secret-test-secret",
+    "LIVEKIT_URL": "wss://test.livekit.invalid",
+})
+
+import fakeredis
+import pytest
+from jarvis_shared.redis_client import NativeRedis
+
+
+
+@pytest.fixture
+def redis():
+    """A NativeRedis adapter over an in-memory fakeredis server."""
+    client = NativeRedis(os.environ["REDIS_URL"])
+    client._target = fakeredis.FakeAsyncRedis(decode_responses=True)
+    return client
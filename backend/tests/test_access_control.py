@@ -0,0 +1,93 @@
+import asyncio
+
+from app.services.access_control import (
+    AccessControlService,
+    _now_ms,
+    active_sessions_key,
+    session_record_key,
+)
+from app.services.tier_catalog import BUILTIN_TIERS, TierCatalog
+from app.services.usage_ledger import UsageLedger
+
+
+def _service(redis) -> AccessControlService:
+    usage = UsageLedger(redis=redis, flush_interval=5, persist_interval=60)
+    return AccessControlService(redis, usage=usage, tiers=TierCatalog(BUILTIN_TIERS, refresh_interval=300))
+
+
+def test_ending_another_users_session_keeps_its_record(redis):
+    async def run():
+        service = _service(redis)
+        await service.admit_session("alice", "free", "session-a", "{}")
+
+        assert await service.end_session("mallory", "session-a", 10) is None
+
+        assert await redis.exists(session_record_key("session-a"))
+        assert await service.get_session_owner("session-a") == ("alice", "free")
+
+    asyncio.run(run())
+
+
+def test_ending_an_ended_session_again_is_a_no_op(redis):
+    async def run():
+        service = _service(redis)
+        await service.admit_session("alice", "free", "session-a", "{}")
+        await service.admit_session("alice", "free", "session-b", "{}")
+
+        ended = await service.end_session("alice", "session-a", 10)
+        assert ended is not None and ended.user_id == "alice"
+        assert await service.end_session("alice", "session-a", 10) is None
+
+        assert not await redis.exists(session_record_key("session-a"))
+        assert await service.get_session_owner("session-b") == ("alice", "free")
+        assert service.usage.pending("alice") == ended.duration_seconds
+
+    asyncio.run(run())
+
+
+def test_reported_duration_is_capped_at_measured_time(redis):
+    async def run():
+        service = _service(redis)
+        await service.admit_session("alice", "free", "session-a", "{}")
+
+        ended = await service.end_session("alice", "session-a", 3600)
+
+        assert ended.duration_seconds <= 1
+
+    asyncio.run(run())
+
+
+def test_low_reported_duration_cannot_undercut_elapsed_time(redis):
+    async def run():
+        service = _service(redis)
+        await service.admit_session("alice", "free", "session-a", "{}")
+        await service.admit_session("alice", "free", "session-b", "{}")
+        ten_minutes_later = _now_ms() + 600_000
+
+        zero = await service.end_session("alice", "session-a", 0, ended_at_ms=ten_minutes_later)
+        low = await service.end_session("alice", "session-b", 5, ended_at_ms=ten_minutes_later)
+
+        assert zero.duration_seconds >= 599
+        assert low.duration_seconds >= 599
+        assert service.usage.pending("alice") == zero.duration_seconds + low.duration_seconds
+
+    asyncio.run(run())
+
+
+def test_session_past_its_deadline_is_still_ended_and_billed(redis):
+    async def run():
+        service = _service(redis)
+        await service.admit_session("guest_1", "guest", "session-a", "{}")
+        # A later admission prunes members past their deadline
+        await redis.zadd(active_sessions_key("guest_1"), {"session-a": 0})
+        await service.admit_session("guest_1", "guest", "session-b", "{}")
+        assert await redis.zscore(active_sessions_key("guest_1"), "session-a") is None
+
+        ended = await service.end_session("guest_1", "session-a", ended_at_ms=_now_ms() + 3_600_000)
+
+        assert ended is not None and ended.duration_seconds >= 3599
+        assert service.usage.pending("guest_1") == ended.duration_seconds
+        assert not await redis.exists(session_record_key("session-a"))
+        assert await service.end_session("guest_1", "session-a") is None
+
+    asyncio.run(run())
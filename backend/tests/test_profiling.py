@@ -0,0 +1,20 @@
+import os
+
+import pytest
+from jarvis_shared.profiling import PROFILE_SUFFIX, ProfileStore
+
+
+def test_store_keeps_the_newest_profiles(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+    for i in range(3):
+        name = f"{i}{PROFILE_SUFFIX}"
+        store.save(name, "{}")
+        os.utime(tmp_path / name, (i, i))  # distinct mtimes, oldest first
+    store.save(f"3{PROFILE_SUFFIX}", "{}")
+
+    assert [p["name"] for p in store.list()] == [f"3{PROFILE_SUFFIX}", f"2{PROFILE_SUFFIX}"]
+
+
+def test_store_must_keep_at_least_one_profile(tmp_path):
+    with pytest.raises(ValueError):
+        ProfileStore(str(tmp_path), max_profiles=0)
@@ -0,0 +1,95 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.livekit import CLAIM_ATTEMPTS, LiveKitService
+from app.services.room_pool import PooledRoom, RoomPool
+
+
+class FakeLiveKit:
+    agent_name = "agent"
+
+    def __init__(self, claim_error: Exception = None):
+        self.claim_error = claim_error
+        self.created = []
+        self.claimed = []
+
+    async def claim_room(self, room_name: str, agent_config: str):
+        self.claimed.append(room_name)
+        if self.claim_error is not None:
+            raise self.claim_error
+
+    async def create_room(self, room_name: str, agent_config: str, **kwargs):
+        self.created.append(room_name)
+
+
+def _pool(livekit) -> RoomPool:
+    return RoomPool(livekit, target_size=2, ttl_seconds=300, refill_interval=5)
+
+
+def _warm_room() -> PooledRoom:
+    return PooledRoom(name="warm-room", warm=True, created_at=time.monotonic())
+
+
+def test_failed_claim_propagates_without_recreating_the_room():
+    livekit = FakeLiveKit(claim_error=RuntimeError("dispatch failed"))
+    pool = _pool(livekit)
+
+    with pytest.raises(RuntimeError, match="dispatch failed"):
+        asyncio.run(pool.activate(_warm_room(), "{}"))
+
+    assert livekit.claimed == ["warm-room"]
+    assert livekit.created == []
+    assert pool.warm_claims == pool.cold_claims == 0
+
+
+def test_cold_room_is_created():
+    livekit = FakeLiveKit()
+    pool = _pool(livekit)
+
+    asyncio.run(pool.activate(PooledRoom(name="cold-room", warm=False), "{}"))
+
+    assert livekit.created == ["cold-room"]
+    assert pool.cold_claims == 1
+
+
+class FlakyTwirpService:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    async def __call__(self, request):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("connection reset")
+
+
+def _livekit_service(metadata: FlakyTwirpService, dispatch: FlakyTwirpService) -> LiveKitService:
+    service = LiveKitService()
+    service.agent_name = "agent"
+    service._client = SimpleNamespace(
+        room=SimpleNamespace(update_room_metadata=metadata),
+        agent_dispatch=SimpleNamespace(create_dispatch=dispatch),
+    )
+    return service
+
+
+def test_claim_retries_only_the_failed_step():
+    metadata, dispatch = FlakyTwirpService(failures=1), FlakyTwirpService(failures=0)
+
+    asyncio.run(_livekit_service(metadata, dispatch).claim_room("warm-room", "{}"))
+
+    assert metadata.calls == 2
+    assert dispatch.calls == 1
+
+
+def test_claim_raises_once_attempts_are_exhausted():
+    metadata, dispatch = FlakyTwirpService(failures=0), FlakyTwirpService(failures=CLAIM_ATTEMPTS)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(_livekit_service(metadata, dispatch).claim_room("warm-room", "{}"))
+
+    assert metadata.calls == 1
+    assert dispatch.calls == CLAIM_ATTEMPTS
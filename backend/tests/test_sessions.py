@@ -0,0 +1,96 @@
+import asyncio
+import time
+from collections import deque
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.routes import sessions
+from app.schemas.access_control import AdmissionResult
+from app.schemas.sessions import CreateSessionRequest
+from app.services.exceptions import LimitExceededError, TierNotFoundError
+from app.services.room_pool import PooledRoom, room_pool
+
+
+def _request() -> Request:
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/sessions",
+        "headers": [(b"user-agent", b"test")],
+        "client": ("127.0.0.1", 50000),
+    })
+
+
+@pytest.fixture
+def warm_room(monkeypatch):
+    room = PooledRoom(name="warm-room", warm=True, created_at=time.monotonic())
+    monkeypatch.setattr(room_pool, "_rooms", deque([room]))
+    monkeypatch.setattr(room_pool, "_refill", asyncio.Event())
+    return room
+
+
+def test_rejected_admission_returns_the_room_without_activating_it(monkeypatch, warm_room):
+    activated = []
+
+    async def admit_session(user_id, tier, session_id, agent_config):
+        raise LimitExceededError(reason="Too many sessions", action="End a session")
+
+    async def activate(room, agent_config):
+        activated.append(room.name)
+
+    monkeypatch.setattr(sessions.access_control, "admit_session", admit_session)
+    monkeypatch.setattr(room_pool, "activate", activate)
+
+    with pytest.raises(HTTPException) as rejected:
+        asyncio.run(sessions.create_session(_request(), CreateSessionRequest(), ("alice", "free")))
+
+    assert rejected.value.status_code == 403
+    assert activated == []
+    assert list(room_pool._rooms) == [warm_room]
+
+
+def test_failed_activation_releases_the_admission(monkeypatch, warm_room):
+    released, deleted = [], []
+
+    async def admit_session(user_id, tier, session_id, agent_config):
+        return AdmissionResult(active_sessions=1, usage_today_minutes=0, remaining_today_minutes=60)
+
+    async def activate(room, agent_config):
+        raise RuntimeError("dispatch failed")
+
+    async def release_session(user_id, session_id):
+        released.append(session_id)
+
+    async def delete_room(room_name):
+        deleted.append(room_name)
+
+    monkeypatch.setattr(sessions.access_control, "admit_session", admit_session)
+    monkeypatch.setattr(sessions.access_control, "release_session", release_session)
+    monkeypatch.setattr(sessions.livekit_service, "delete_room", delete_room)
+    monkeypatch.setattr(room_pool, "activate", activate)
+
+    with pytest.raises(HTTPException) as failed:
+        asyncio.run(sessions.create_session(_request(), CreateSessionRequest(), ("alice", "free")))
+
+    assert failed.value.status_code == 500
+    assert released == deleted == ["warm-room"]
+    assert list(room_pool._rooms) == []
+
+
+def test_unknown_tier_is_reported_the_same_way_by_create_and_heartbeat(monkeypatch, warm_room):
+    async def unknown_tier(*args):
+        raise TierNotFoundError(reason="Tier 'gold' not found", action="Contact support")
+
+    monkeypatch.setattr(sessions.access_control, "admit_session", unknown_tier)
+    monkeypatch.setattr(sessions.access_control, "heartbeat", unknown_tier)
+
+    with pytest.raises(HTTPException) as created:
+        asyncio.run(sessions.create_session(_request(), CreateSessionRequest(), ("alice", "gold")))
+    with pytest.raises(HTTPException) as heartbeat:
+        asyncio.run(sessions.heartbeat("session-1", ("alice", "gold")))
+
+    expected = {"reason": "Tier 'gold' not found", "action": "Contact support"}
+    assert (created.value.status_code, created.value.detail) == (400, expected)
+    assert (heartbeat.value.status_code, heartbeat.value.detail) == (400, expected)
@@ -0,0 +1,50 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.services import user_cache as user_cache_module
+from app.services.user_cache import UserCache
+
+
+class FakeUsers:
+    """The users table, reached through the cache's get_db_connection."""
+
+    def __init__(self):
+        self.rows = {}
+
+    @asynccontextmanager
+    async def connection(self):
+        yield None
+
+    async def get_user_by_id(self, conn, user_id):
+        return dict(self.rows[user_id]) if user_id in self.rows else None
+
+    async def get_or_create_user(self, conn, email, name, picture):
+        row = next((r for r in self.rows.values() if r["email"] == email), None)
+        if row is None:
+            row = {"id": f"user-{len(self.rows) + 1}", "email": email, "tier_id": "free"}
+            self.rows[row["id"]] = row
+        row.update(name=name, profile_pic=picture)
+        return dict(row)
+
+
+def test_login_upsert_refreshes_both_layers(monkeypatch, redis):
+    users = FakeUsers()
+    monkeypatch.setattr(user_cache_module, "get_db_connection", users.connection)
+    monkeypatch.setattr(user_cache_module, "get_user_by_id", users.get_user_by_id)
+    monkeypatch.setattr(user_cache_module, "get_or_create_user", users.get_or_create_user)
+
+    def replica() -> UserCache:
+        return UserCache(redis, maxsize=10, ttl_seconds=60, shared_ttl_seconds=600, shared=True)
+
+    async def run():
+        cache = replica()
+        user = await cache.get_or_create("ada@example.com", "Ada", "old.png")
+        assert (await cache.get_by_id(user["id"]))["profile_pic"] == "old.png"
+
+        await cache.get_or_create("ada@example.com", "Ada", "new.png")
+        assert (await cache.get_by_id(user["id"]))["profile_pic"] == "new.png"
+        other = replica()
+        assert (await other.get_by_id(user["id"]))["profile_pic"] == "new.png"
+        assert cache.db_reads == other.db_reads == 0
+
+    asyncio.run(run())
@@ -8,5 +8,42 @@ INTERNAL_API_KEY = os.getenv("INTERNAL_API_KEY")
 UPSTASH_REDIS_REST_URL = os.getenv("UPSTASH_REDIS_REST_URL")
 UPSTASH_REDIS_REST_TOKEN = os.getenv("UPSTASH_REDIS_REST_TOKEN")
 
+REDIS_BACKEND = os.getenv("REDIS_BACKEND", "upstash")  # "upstash" (REST) or "native" (RESP pool on REDIS_URL)
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+
+# Token-bucket limits for POST /v1/chat/completions, as "requests/seconds"
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_CHAT_USER = os.getenv("RATE_LIMIT_CHAT_USER", "30/60")
+RATE_LIMIT_CHAT_IP = os.getenv("RATE_LIMIT_CHAT_IP", "60/60")
+RATE_LIMIT_CHAT_GLOBAL = os.getenv("RATE_LIMIT_CHAT_GLOBAL", "1200/60")  # whole service, protects the LLM provider
+
+# Prompt history budget in (estimated) tokens; per-model overrides as "model=tokens,model=tokens".
+# Requests may ask for less with `context_tokens`, never more.
+CHAT_CONTEXT_TOKENS = int(os.getenv("CHAT_CONTEXT_TOKENS", "16000"))
+CHAT_CONTEXT_TOKENS_BY_MODEL = os.getenv("CHAT_CONTEXT_TOKENS_BY_MODEL", "")
+
+# Rolling summary of older turns, updated in the background after a reply. Once a chat has
+# CHAT_SUMMARY_BATCH_MESSAGES unsummarized messages older than its last CHAT_SUMMARY_KEEP_MESSAGES,
+# up to CHAT_SUMMARY_MAX_MESSAGES of them are folded into the summary (model defaults to the chat's)
+CHAT_SUMMARY_ENABLED = os.getenv("CHAT_SUMMARY_ENABLED", "true").lower() == "true"
+CHAT_SUMMARY_MODEL = os.getenv("CHAT_SUMMARY_MODEL", "")
+CHAT_SUMMARY_KEEP_MESSAGES = int(os.getenv("CHAT_SUMMARY_KEEP_MESSAGES", "20"))
+CHAT_SUMMARY_BATCH_MESSAGES = int(os.getenv("CHAT_SUMMARY_BATCH_MESSAGES", "20"))
+CHAT_SUMMARY_MAX_MESSAGES = int(os.getenv("CHAT_SUMMARY_MAX_MESSAGES", "200"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "600"))
+
+# In-process LRU of recently active chat histories, bounded by total estimated tokens
+# (0 disables it); each chat keeps at most CHAT_HISTORY_CACHE_ENTRY_TOKENS of its tail
+CHAT_HISTORY_CACHE_TOKENS = int(os.getenv("CHAT_HISTORY_CACHE_TOKENS", "4000000"))
+CHAT_HISTORY_CACHE_ENTRY_TOKENS = int(os.getenv("CHAT_HISTORY_CACHE_ENTRY_TOKENS", "32000"))
+
 OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL")
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+
+# On-demand request profiling (needs the "profiling" extra): send "X-Profile: <PROFILING_TOKEN>",
+# or set PROFILING_SAMPLE_RATE; the middleware is not installed when neither is set
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_DIR = os.getenv("PROFILING_DIR", "/tmp/chat-profiles")
+PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "50"))
@@ -1,65 +1,111 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request, status
 from fastapi.responses import StreamingResponse
+from prometheus_client import Gauge
+from jarvis_shared.json_response import dumps
+from jarvis_shared.rate_limiter import Rate, RateLimitDecision, RateLimiter
+import logging
 import uuid
 import time
 
-from app.schemas.completions import (
-    ChatCompletionChunk,
-    ChatCompletionChunkChoice,
-    ChatCompletionRequest,
-    DeltaMessage,
-)
+from app import config
+from app.schemas.completions import ChatCompletionRequest
 from app.services.llm_client import llm_client
 from app.services import chat_storage
+from app.services.redis_client import redis_client
+from app.services.summarizer import chat_summarizer
+from app.services.tokens import context_budget, estimate_tokens
 
 
+logger = logging.getLogger(__name__)
 router = APIRouter(tags=["completions"])
 
+chat_rate_limiter = RateLimiter(redis_client, name="chat")
+USER_RATE = Rate.parse(config.RATE_LIMIT_CHAT_USER)
+IP_RATE = Rate.parse(config.RATE_LIMIT_CHAT_IP)
+GLOBAL_RATE = Rate.parse(config.RATE_LIMIT_CHAT_GLOBAL)
+
+ACTIVE_STREAMS = Gauge(
+    "chat_active_streams",
+    "Chat completion streams currently being sent",
+)
+
+
+async def _check_rate_limit(request: Request, user: str | None) -> RateLimitDecision | None:
+    if not config.RATE_LIMIT_ENABLED:
+        return None
+    limiter = chat_rate_limiter
+    buckets = [
+        (limiter.key("ip", request.client.host), IP_RATE),
+        (limiter.key("global", "all"), GLOBAL_RATE),
+    ]
+    if user:
+        buckets.insert(0, (limiter.key("user", user), USER_RATE))
+    decision = await limiter.hit(buckets)
+    if decision is not None and not decision.allowed:
+        logger.warning(f"Chat completion rate limited for {user} | IP: {request.client.host}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, try again later",
+            headers=decision.headers(),
+        )
+    return decision
+
 
 @router.post("/v1/chat/completions")
-async def create_chat_completion(req: ChatCompletionRequest):
+async def create_chat_completion(req: ChatCompletionRequest, request: Request):
     """
     OpenAI-compatible endpoint for streaming chat completions with chat persistence.
     """
+    rate_limit = await _check_rate_limit(request, req.user)
+
     run_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
     created = int(time.time())
 
     chat_id = req.chat_id
-    new_chat = chat_id is None
-    if new_chat:
-        chat_id = await chat_storage.create_chat(user_id=req.user)
-        history_records = []
-    else:
-        history_records = await chat_storage.get_messages(chat_id)
+    new_chat_metadata = None
+    if chat_id is None:
+        chat_id, new_chat_metadata = chat_storage.new_chat(user_id=req.user)
 
     now = int(time.time())
+    pending_records = []
 
     # Persist initial system/tool prompts for brand-new chats so future turns keep context.
-    if new_chat:
+    if new_chat_metadata is not None:
         for message in req.messages:
             if message.role in ("system", "tool"):
-                stored_message = {
+                pending_records.append({
                     "id": uuid.uuid4().hex,
                     "role": message.role,
                     "content": message.content,
                     "ts": now,
-                }
-                await chat_storage.append_message(chat_id, stored_message, dedupe=False)
-                history_records.append(stored_message)
+                    "tokens": estimate_tokens(message.content),
+                })
 
     # Persist the user's latest message (idempotent when message_id is reused).
     user_message = next((msg for msg in reversed(req.messages) if msg.role == "user"), None)
     user_message_id = req.message_id or uuid.uuid4().hex
     if user_message is not None:
-        user_entry = {
+        pending_records.append({
             "id": user_message_id,
             "role": "user",
             "content": user_message.content,
-            "ts": int(time.time()),
-        }
-        stored = await chat_storage.append_message(chat_id, user_entry, dedupe=True)
-        if stored:
-            history_records.append(user_entry)
+            "ts": now,
+            "tokens": estimate_tokens(user_message.content),
+        })
+
+    # New chat, its prompts and the user's message are written in one round trip
+    appended = await chat_storage.append_messages(
+        chat_id, pending_records, dedupe=True, new_chat_metadata=new_chat_metadata
+    )
+
+    # Only the summary and the latest history that fit the model's token budget are sent;
+    # the append's version lets a process that served the previous turn skip the read
+    if new_chat_metadata is None:
+        history_records = await chat_storage.get_recent_messages(
+            chat_id, context_budget(req.model, req.context_tokens), version=appended.version
+        )
+    else:
+        history_records = [record for record, ok in zip(pending_records, appended.stored) if ok]
 
     # Build context for the LLM with persisted history (fallback to request payload if empty).
     context_messages = [
@@ -73,45 +119,54 @@ async def create_chat_completion(req: ChatCompletionRequest):
     assistant_tokens: list[str] = []
 
     async def event_stream():
-        async for chunk in llm_client.stream_chat_completion(
-            model=req.model,
-            messages=context_messages,
-            temperature=req.temperature,
-            max_tokens=req.max_tokens,
-            top_p=req.top_p,
-            n=req.n,
-            stop=req.stop,
-        ):
-            delta_role = getattr(chunk.choices[0].delta, "role", None)
-            delta_content = getattr(chunk.choices[0].delta, "content", None)
-            if delta_content:
-                assistant_tokens.append(delta_content)
-
-            choice = ChatCompletionChunkChoice(
-                index=0,
-                delta=DeltaMessage(
-                    role=delta_role,
-                    content=delta_content,
-                ),
-                finish_reason=chunk.choices[0].finish_reason,
-            )
-            out = ChatCompletionChunk(
-                id=run_id,
-                created=created,
+        with ACTIVE_STREAMS.track_inprogress():
+            async for chunk in llm_client.stream_chat_completion(
                 model=req.model,
-                chat_id=chat_id,
-                message_id=assistant_message_id,
-                choices=[choice],
-            )
-            yield f"data: {out.model_dump_json()}\n\n"
-
-        assistant_message = {
-            "id": assistant_message_id,
-            "role": "assistant",
-            "content": "".join(assistant_tokens),
-            "ts": int(time.time()),
-        }
-        await chat_storage.append_message(chat_id, assistant_message, dedupe=False)
-        yield "data: [DONE]\n\n"
-
-    return StreamingResponse(event_stream(), media_type="text/event-stream")
+                messages=context_messages,
+                temperature=req.temperature,
+                max_tokens=req.max_tokens,
+                top_p=req.top_p,
+                n=req.n,
+                stop=req.stop,
+            ):
+                delta_role = getattr(chunk.choices[0].delta, "role", None)
+                delta_content = getattr(chunk.choices[0].delta, "content", None)
+                if delta_content:
+                    assistant_tokens.append(delta_content)
+
+                # Same shape as ChatCompletionChunk, built as a dict to skip per-token validation.
+                out = {
+                    "id": run_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": req.model,
+                    "chat_id": chat_id,
+                    "message_id": assistant_message_id,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "delta": {"role": delta_role, "content": delta_content},
+                            "finish_reason": chunk.choices[0].finish_reason,
+                        }
+                    ],
+                }
+                yield b"data: " + dumps(out) + b"\n\n"
+
+            assistant_content = "".join(assistant_tokens)
+            assistant_message = {
+                "id": assistant_message_id,
+                "role": "assistant",
+                "content": assistant_content,
+                "ts": int(time.time()),
+                "tokens": estimate_tokens(assistant_content),
+            }
+            await chat_storage.append_message(chat_id, assistant_message, dedupe=False)
+            yield b"data: [DONE]\n\n"
+            # Fold older turns into the chat's summary off the request path
+            chat_summarizer.schedule(chat_id, req.model)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers=rate_limit.headers() if rate_limit else None,
+    )
@@ -46,6 +46,11 @@ class ChatCompletionRequest(BaseModel):
         None,
         description="Client-supplied ID for the new user message (for idempotency).",
     )
+    context_tokens: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Token budget for stored history sent to the model (capped at the model's budget).",
+    )
 
 
 class DeltaMessage(BaseModel):
@@ -1,13 +1,98 @@
 import json
 import time
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
+from jarvis_shared.redis_scripts import RedisScript
+
+from app.services.history_cache import CachedHistory, history_cache
 from app.services.redis_client import redis_client
+from app.services.tokens import estimate_tokens, message_tokens
 
 
 CHAT_KEY_PREFIX = "chat:"
 CHAT_MESSAGES_SUFFIX = ":messages"
+CHAT_IDS_SUFFIX = ":ids"
+
+# Tail-first history reads: the first window, and how many head entries are
+# checked for the system prompt (stored first when a chat is created)
+HISTORY_WINDOW = 32
+SYSTEM_HEAD_SIZE = 4
+SUMMARY_MESSAGE_ID = "summary"
+
+# Message ids are indexed in a SET next to the list, so dedupe is one SADD
+# instead of scanning the history. Chats stored before the index existed are
+# indexed from their list on their next append. A whole batch of messages,
+# the chat metadata (and, for a new chat, its creation) is one round trip.
+# Every change to the history bumps the `version` field, which the
+# in-process history cache checks entries against.
+# KEYS: chat metadata hash, messages list, id index
+# ARGV: dedupe ("1"/"0"), now (s), metadata for a new chat as JSON ("" = existing chat),
+#       then message id ("" = none) and JSON payload for each message
+# Returns {version before, version after, list length, then 1 (stored) or
+#          0 (id already present) for each message}
+APPEND_MESSAGES_SCRIPT = RedisScript("""
+if ARGV[3] ~= '' then
+    for field, value in pairs(cjson.decode(ARGV[3])) do
+        redis.call('HSET', KEYS[1], field, value)
+    end
+end
+if redis.call('EXISTS', KEYS[3]) == 0 then
+    for _, raw in ipairs(redis.call('LRANGE', KEYS[2], 0, -1)) do
+        local ok, message = pcall(cjson.decode, raw)
+        if ok and type(message) == 'table' and type(message['id']) == 'string' then
+            redis.call('SADD', KEYS[3], message['id'])
+        end
+    end
+end
+local version = tonumber(redis.call('HGET', KEYS[1], 'version') or '0')
+local results = {version, version, 0}
+local payloads = {}
+local last_id = nil
+for i = 4, #ARGV, 2 do
+    local id = ARGV[i]
+    local stored = 1
+    if id ~= '' and redis.call('SADD', KEYS[3], id) == 0 and ARGV[1] == '1' then
+        stored = 0
+    end
+    if stored == 1 then
+        payloads[#payloads + 1] = ARGV[i + 1]
+        if id ~= '' then
+            last_id = id
+        end
+    end
+    results[#results + 1] = stored
+end
+if #payloads > 0 then
+    redis.call('RPUSH', KEYS[2], unpack(payloads))
+    redis.call('HSET', KEYS[1], 'updated_at', ARGV[2])
+    if last_id then
+        redis.call('HSET', KEYS[1], 'last_message_id', last_id)
+    end
+    results[2] = redis.call('HINCRBY', KEYS[1], 'version', 1)
+end
+results[3] = redis.call('LLEN', KEYS[2])
+return results
+""")
+
+
+# Stores a new rolling summary unless another writer advanced it first.
+# KEYS: chat metadata hash
+# ARGV: summary, messages covered before (list index), messages covered now, summary tokens
+# Returns 1 if stored
+SAVE_SUMMARY_SCRIPT = RedisScript("""
+if tonumber(redis.call('HGET', KEYS[1], 'summary_upto') or '0') ~= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'summary', ARGV[1], 'summary_upto', ARGV[3], 'summary_tokens', ARGV[4])
+redis.call('HINCRBY', KEYS[1], 'version', 1)
+return 1
+""")
+
+
+class AppendResult(NamedTuple):
+    stored: List[bool]  # per message; False if skipped due to dedupe
+    version: int        # the chat's history version after the append
 
 
 def _chat_key(chat_id: str) -> str:
@@ -18,8 +103,12 @@ def _chat_messages_key(chat_id: str) -> str:
     return f"{CHAT_KEY_PREFIX}{chat_id}{CHAT_MESSAGES_SUFFIX}"
 
 
-async def create_chat(user_id: Optional[str] = None, title: Optional[str] = None) -> str:
-    """Create a new chat record and return its ID."""
+def _chat_ids_key(chat_id: str) -> str:
+    return f"{CHAT_KEY_PREFIX}{chat_id}{CHAT_IDS_SUFFIX}"
+
+
+def new_chat(user_id: Optional[str] = None, title: Optional[str] = None) -> Tuple[str, Dict[str, str]]:
+    """A fresh chat ID and its metadata, to be written with its first messages."""
     chat_id = uuid.uuid4().hex
     now = int(time.time())
     metadata = {
@@ -30,32 +119,200 @@ async def create_chat(user_id: Optional[str] = None, title: Optional[str] = None
         metadata["user_id"] = user_id
     if title:
         metadata["title"] = title
+    return chat_id, metadata
+
+
+async def create_chat(user_id: Optional[str] = None, title: Optional[str] = None) -> str:
+    """Create a new chat record and return its ID."""
+    chat_id, metadata = new_chat(user_id, title)
     await redis_client.hset(_chat_key(chat_id), values=metadata)
     return chat_id
 
 
+def _decode(raw: Any) -> Optional[Dict[str, Any]]:
+    if raw is None:
+        return None
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8")
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return None
+
+
 async def get_messages(chat_id: str) -> List[Dict[str, Any]]:
     """Return all messages stored for a chat."""
     raw_messages = await redis_client.lrange(_chat_messages_key(chat_id), 0, -1)
-    messages: List[Dict[str, Any]] = []
-    for raw in raw_messages or []:
-        if raw is None:
-            continue
-        if isinstance(raw, bytes):
-            raw = raw.decode("utf-8")
-        try:
-            message = json.loads(raw)
-        except json.JSONDecodeError:
-            continue
-        messages.append(message)
-    return messages
+    messages = (_decode(raw) for raw in raw_messages or [])
+    return [message for message in messages if message is not None]
+
+
+def _system_head(raw_messages: List[Any]) -> List[Dict[str, Any]]:
+    head: List[Dict[str, Any]] = []
+    for message in map(_decode, raw_messages or []):
+        if message is None or message.get("role") != "system":
+            break
+        head.append(message)
+    return head
+
+
+def _summary_message(summary: str, tokens: Optional[str]) -> Dict[str, Any]:
+    content = f"Summary of the earlier conversation:\n{summary}"
+    return {
+        "id": SUMMARY_MESSAGE_ID,
+        "role": "system",
+        "content": content,
+        "tokens": int(tokens) if tokens else estimate_tokens(content),
+    }
+
+
+async def get_recent_messages(
+    chat_id: str, token_budget: int, version: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    The chat's leading system messages, its rolling summary (if any) and as
+    many of its latest unsummarized messages as fit in `token_budget`, oldest first.
+
+    Reads the list from the tail in doubling windows and stops at the budget,
+    so the cost follows the budget instead of the chat's length. The system
+    prompt and summary are always kept, even if they alone exceed the budget.
+
+    Pass the `version` returned by `append_messages` to serve the history
+    from the in-process cache when this process has it at that version.
+    """
+    if version is not None:
+        entry = history_cache.get(chat_id, version)
+        selected = entry.select(token_budget) if entry is not None else None
+        if selected is not None:
+            return selected
+
+    key = _chat_messages_key(chat_id)
+    pipe = redis_client.multi()  # one snapshot of the version and the list
+    pipe.llen(key)
+    pipe.lrange(key, 0, SYSTEM_HEAD_SIZE - 1)
+    pipe.lrange(key, -HISTORY_WINDOW, -1)
+    pipe.hmget(_chat_key(chat_id), "summary", "summary_upto", "summary_tokens", "version")
+    length, head_raw, window_raw, (summary, summary_upto, summary_tokens, stored_version) = await pipe.exec()
+    length = int(length or 0)
+
+    head = _system_head(head_raw)
+    # Messages before `floor` are the system prompt or covered by the summary
+    floor = max(len(head), int(summary_upto or 0))
+    if summary:
+        head.append(_summary_message(summary, summary_tokens))
+    remaining = token_budget - sum(message_tokens(message) for message in head)
+
+    tail: List[Dict[str, Any]] = []
+    start, window = max(length - HISTORY_WINDOW, 0), HISTORY_WINDOW
+    oldest = length  # list index of the oldest message looked at
+    overflow: List[Dict[str, Any]] = []  # the message that did not fit, kept for the cache
+    while True:
+        raw_messages = list(window_raw or [])
+        done = start <= floor
+        for offset in range(len(raw_messages) - 1, -1, -1):
+            if start + offset < floor:
+                done = True
+                break
+            message = _decode(raw_messages[offset])
+            oldest = start + offset
+            if message is None:
+                continue
+            tokens = message_tokens(message)
+            if tokens > remaining:
+                overflow.append(message)
+                done = True
+                break
+            remaining -= tokens
+            tail.append(message)
+        if done:
+            break
+        window *= 2
+        end, start = start - 1, max(start - window, 0)
+        window_raw = await redis_client.lrange(key, start, end)
+
+    tail.reverse()
+    history_cache.put(chat_id, CachedHistory(
+        version=int(stored_version or 0), head=head, floor=floor, start=oldest, tail=overflow + tail
+    ))
+    return head + tail
+
+
+async def get_summary_backlog(
+    chat_id: str, keep: int, limit: int
+) -> Tuple[str, int, int, List[Dict[str, Any]]]:
+    """
+    Messages due to be folded into the summary: the unsummarized ones before
+    the chat's last `keep` messages, oldest first, at most `limit` of them.
+
+    Returns (current summary, list index it covers up to, index covered once
+    these messages are folded in, messages).
+    """
+    pipe = redis_client.pipeline()
+    pipe.llen(_chat_messages_key(chat_id))
+    pipe.lrange(_chat_messages_key(chat_id), 0, SYSTEM_HEAD_SIZE - 1)
+    pipe.hmget(_chat_key(chat_id), "summary", "summary_upto")
+    length, head_raw, (summary, summary_upto) = await pipe.exec()
+    upto = int(summary_upto or 0)
+    start = max(upto, len(_system_head(head_raw)))
+    end = min(int(length or 0) - keep, start + limit)
+    if end <= start:
+        return summary or "", upto, upto, []
+    raw_messages = await redis_client.lrange(_chat_messages_key(chat_id), start, end - 1)
+    messages = (_decode(raw) for raw in raw_messages or [])
+    return summary or "", upto, end, [message for message in messages if message is not None]
+
+
+async def save_summary(chat_id: str, summary: str, previous_upto: int, upto: int) -> bool:
+    """Store a summary covering the list up to `upto`, unless it moved past `previous_upto` meanwhile."""
+    stored = await SAVE_SUMMARY_SCRIPT(
+        redis_client,
+        keys=[_chat_key(chat_id)],
+        args=[summary, previous_upto, upto, estimate_tokens(summary)],
+    )
+    return bool(int(stored))
 
 
 async def message_exists(chat_id: str, message_id: Optional[str]) -> bool:
     if not message_id:
         return False
-    existing = await get_messages(chat_id)
-    return any(msg.get("id") == message_id for msg in existing)
+    return bool(await redis_client.sismember(_chat_ids_key(chat_id), message_id))
+
+
+async def append_messages(
+    chat_id: str,
+    messages: List[Dict[str, Any]],
+    *,
+    dedupe: bool = True,
+    new_chat_metadata: Optional[Dict[str, str]] = None,
+) -> AppendResult:
+    """
+    Persist messages in order, in a single atomic round trip. Pass the metadata
+    from `new_chat` to create the chat in the same call. Stored messages are
+    written through to the history cache.
+    """
+    args: List[Any] = [
+        "1" if dedupe else "0",
+        int(time.time()),
+        json.dumps(new_chat_metadata) if new_chat_metadata is not None else "",
+    ]
+    for message in messages:
+        args += [message.get("id") or "", json.dumps(message)]
+    previous_version, version, length, *results = [
+        int(value) for value in await APPEND_MESSAGES_SCRIPT(
+            redis_client,
+            keys=[_chat_key(chat_id), _chat_messages_key(chat_id), _chat_ids_key(chat_id)],
+            args=args,
+        )
+    ]
+    stored = [bool(result) for result in results]
+    history_cache.appended(
+        chat_id,
+        previous_version,
+        version,
+        [message for message, ok in zip(messages, stored) if ok],
+        length,
+    )
+    return AppendResult(stored=stored, version=version)
 
 
 async def append_message(
@@ -67,16 +324,5 @@ async def append_message(
     """
     Persist a chat message. Returns True if stored, False if skipped due to dedupe.
     """
-    message_id = message.get("id")
-    if dedupe and await message_exists(chat_id, message_id):
-        return False
-
-    payload = json.dumps(message)
-    await redis_client.rpush(_chat_messages_key(chat_id), payload)
-    updates = {
-        "updated_at": str(int(time.time())),
-    }
-    if message_id:
-        updates["last_message_id"] = message_id
-    await redis_client.hset(_chat_key(chat_id), values=updates)
-    return True
+    result = await append_messages(chat_id, [message], dedupe=dedupe)
+    return result.stored[0]
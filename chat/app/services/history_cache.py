@@ -0,0 +1,138 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from jarvis_shared.metrics import CACHE_REQUESTS
+
+from app import config
+from app.services.tokens import message_tokens
+
+
+@dataclass
+class CachedHistory:
+    """A contiguous tail of one chat's message list, as of `version`."""
+
+    version: int
+    head: List[Dict[str, Any]]  # leading system messages, plus the summary message if any
+    floor: int                  # list index where unsummarized history starts
+    start: int                  # list index of tail[0]
+    tail: List[Dict[str, Any]] = field(default_factory=list)
+    tokens: int = 0
+
+    def __post_init__(self):
+        self.tokens = sum(map(message_tokens, self.tail))
+
+    def select(self, token_budget: int) -> Optional[List[Dict[str, Any]]]:
+        """Same selection as chat_storage.get_recent_messages, or None if the cached tail is too short."""
+        remaining = token_budget - sum(map(message_tokens, self.head))
+        selected: List[Dict[str, Any]] = []
+        for message in reversed(self.tail):
+            tokens = message_tokens(message)
+            if tokens > remaining:
+                return self.head + selected[::-1]
+            remaining -= tokens
+            selected.append(message)
+        if self.start > self.floor:
+            return None
+        return self.head + selected[::-1]
+
+
+class ChatHistoryCache:
+    """
+    Per-process LRU of recently active chats' parsed history, bounded by the
+    total (estimated) tokens it holds.
+
+    Every append bumps a version stamp in the chat's metadata hash and reports
+    the version it replaced, so appends made through this process are written
+    through to the cached tail, and an entry is dropped as soon as an append
+    shows that another replica (or the summarizer) changed the chat meanwhile.
+    Entries are only served for the version the caller has just seen in Redis.
+    """
+
+    def __init__(self, max_tokens: int, entry_tokens: int):
+        self.max_tokens = max_tokens
+        self.entry_tokens = entry_tokens
+        self.tokens = 0
+        self._entries: "OrderedDict[str, CachedHistory]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_tokens > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self, chat_id: str):
+        entry = self._entries.pop(chat_id, None)
+        if entry is not None:
+            self.tokens -= entry.tokens
+
+    def _trim(self, entry: CachedHistory):
+        dropped = 0
+        while entry.tail and entry.tokens > self.entry_tokens:
+            entry.tokens -= message_tokens(entry.tail[dropped])
+            dropped += 1
+        if dropped:
+            del entry.tail[:dropped]
+            entry.start += dropped
+
+    def put(self, chat_id: str, entry: CachedHistory):
+        if not self.enabled:
+            return
+        self.invalidate(chat_id)
+        self._trim(entry)
+        self._entries[chat_id] = entry
+        self.tokens += entry.tokens
+        while self.tokens > self.max_tokens and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.tokens -= evicted.tokens
+
+    def get(self, chat_id: str, version: int) -> Optional[CachedHistory]:
+        entry = self._entries.get(chat_id)
+        if entry is None:
+            CACHE_REQUESTS.labels("chat_history", "miss").inc()
+            return None
+        if entry.version != version:
+            CACHE_REQUESTS.labels("chat_history", "stale").inc()
+            self.invalidate(chat_id)
+            return None
+        CACHE_REQUESTS.labels("chat_history", "hit").inc()
+        self._entries.move_to_end(chat_id)
+        return entry
+
+    def appended(
+        self, chat_id: str, previous_version: int, version: int, messages: List[Dict[str, Any]], length: int
+    ):
+        """Write through messages just appended (the list is now `length` long)."""
+        if not self.enabled or version == previous_version:
+            return
+        entry = self._entries.get(chat_id)
+        if entry is not None and entry.version == previous_version:
+            self.tokens -= entry.tokens
+            entry.tail.extend(messages)
+            entry.tokens += sum(map(message_tokens, messages))
+            entry.version = version
+            self._entries.move_to_end(chat_id)
+            self._trim(entry)
+            self.tokens += entry.tokens
+            while self.tokens > self.max_tokens and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.tokens -= evicted.tokens
+        elif length == len(messages):
+            # A brand-new list: these messages are the whole chat
+            head = []
+            for message in messages:
+                if message.get("role") != "system":
+                    break
+                head.append(message)
+            self.put(chat_id, CachedHistory(
+                version=version, head=head, floor=len(head), start=len(head), tail=messages[len(head):]
+            ))
+        else:
+            self.invalidate(chat_id)
+
+
+history_cache = ChatHistoryCache(
+    max_tokens=config.CHAT_HISTORY_CACHE_TOKENS,
+    entry_tokens=config.CHAT_HISTORY_CACHE_ENTRY_TOKENS,
+)
@@ -1,6 +1,8 @@
 import os
+import time
 from openai import AsyncOpenAI
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
+from jarvis_shared.metrics import observe_dependency, track
 
 from app import config
 
@@ -10,19 +12,46 @@ class LLMClient:
     Can point to OpenAI directly, or to a proxy like OpenRouter.
     """
     def __init__(self, base_url: str = None, api_key: str = None):
-        self.client = AsyncOpenAI(
-            base_url=config.OPENROUTER_BASE_URL,
-            api_key=config.OPENROUTER_API_KEY
-        )
+        self._client: Optional[AsyncOpenAI] = None
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Created on first use, so importing the service (e.g. offline, with a stub LLM) needs no credentials."""
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                base_url=config.OPENROUTER_BASE_URL,
+                api_key=config.OPENROUTER_API_KEY
+            )
+        return self._client
 
     async def stream_chat_completion(self, **kwargs) -> AsyncGenerator[str, None]:
         """
         Streams assistant tokens from an LLM.
 
         Yields: partial chunks (as dicts) compatible with ChatCompletionChunk.
+        Records time to first token and to the end of the stream.
         """
-        stream = await self.client.chat.completions.create(**kwargs, stream=True)
-        async for event in stream:
-            yield event
+        start = time.perf_counter()
+        async with track("openrouter", "create"):
+            stream = await self.client.chat.completions.create(**kwargs, stream=True)
+        first_token = True
+        error = None
+        try:
+            async for event in stream:
+                if first_token:
+                    observe_dependency("openrouter", "first_token", time.perf_counter() - start)
+                    first_token = False
+                yield event
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            observe_dependency("openrouter", "stream", time.perf_counter() - start, error)
+
+    async def complete(self, **kwargs) -> str:
+        """Non-streaming completion; returns the first choice's text."""
+        async with track("openrouter", "complete"):
+            response = await self.client.chat.completions.create(**kwargs)
+        return response.choices[0].message.content or ""
 
 llm_client = LLMClient()
\ No newline at end of file
@@ -1,8 +1,13 @@
-from upstash_redis.asyncio import Redis
-from app import config
+from jarvis_shared.metrics import InstrumentedRedis
+from jarvis_shared.redis_client import create_redis_client
 
-redis_client = Redis(
-    url=config.UPSTASH_REDIS_REST_URL,
-    token=config.UPSTASH_REDIS_REST_TOKEN,
-)
+import app.config as config
 
+# Every command is timed for /metrics (see jarvis_shared.metrics)
+redis_client = InstrumentedRedis(create_redis_client(
+    config.REDIS_BACKEND,
+    url=config.REDIS_URL,
+    max_connections=config.REDIS_MAX_CONNECTIONS,
+    upstash_url=config.UPSTASH_REDIS_REST_URL,
+    upstash_token=config.UPSTASH_REDIS_REST_TOKEN,
+))
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from app import config
+from app.services import chat_storage
+from app.services.llm_client import llm_client
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Update the current summary with the new messages. Keep facts about the user, decisions, "
+    "names, numbers and open questions; drop small talk. Write plain prose, at most a few "
+    "paragraphs, and reply with the updated summary only."
+)
+
+# Async callable taking OpenAI chat completion arguments and returning the reply text
+Complete = Callable[..., Awaitable[str]]
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, list):
+        return " ".join(part.get("text") or "" for part in content if isinstance(part, dict))
+    return str(content or "")
+
+
+def summary_prompt(summary: str, messages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    transcript = "\n".join(f"{message.get('role')}: {_text(message.get('content'))}" for message in messages)
+    return [
+        {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+        {
+            "role": "user",
+            "content": f"Current summary:\n{summary or '(none yet)'}\n\nNew messages:\n{transcript}",
+        },
+    ]
+
+
+class ChatSummarizer:
+    """
+    Folds older chat turns into a rolling summary stored in the chat's metadata.
+
+    Runs as a background task after a reply has been streamed, never on the
+    request path. The LLM call is injected (`complete`), so it can run against
+    a stub offline. Summaries are written with a compare-and-set on the range
+    they cover, so concurrent runs for the same chat (e.g. on another replica)
+    cannot overwrite a newer summary.
+    """
+
+    def __init__(
+        self,
+        complete: Complete,
+        *,
+        model: str = "",
+        keep_messages: int = 20,
+        batch_messages: int = 20,
+        max_messages: int = 200,
+        max_tokens: int = 600,
+        enabled: bool = True,
+    ):
+        self.complete = complete
+        self.model = model
+        self.keep_messages = keep_messages
+        self.batch_messages = batch_messages
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+        self.enabled = enabled
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def summarize(self, chat_id: str, model: Optional[str] = None) -> bool:
+        """Fold the chat's due messages into its summary. Returns True if a new summary was stored."""
+        summary, previous_upto, upto, messages = await chat_storage.get_summary_backlog(
+            chat_id, keep=self.keep_messages, limit=self.max_messages
+        )
+        if upto - previous_upto < self.batch_messages:
+            return False
+
+        updated = await self.complete(
+            model=self.model or model,
+            messages=summary_prompt(summary, messages),
+            max_tokens=self.max_tokens,
+            temperature=0.2,
+        )
+        if not updated.strip():
+            logger.warning(f"Empty summary returned for chat {chat_id}, keeping the previous one")
+            return False
+
+        stored = await chat_storage.save_summary(chat_id, updated.strip(), previous_upto, upto)
+        if stored:
+            logger.info(f"Summarized chat {chat_id} up to message {upto} ({len(messages)} folded)")
+        return stored
+
+    async def _run(self, chat_id: str, model: Optional[str]):
+        try:
+            await self.summarize(chat_id, model)
+        except Exception as e:
+            logger.warning(f"Summarizing chat {chat_id} failed: {e}")
+        finally:
+            self._running.discard(chat_id)
+
+    def schedule(self, chat_id: str, model: Optional[str] = None):
+        """Start summarizing in the background; at most one run per chat in this process."""
+        if not self.enabled or chat_id in self._running:
+            return
+        self._running.add(chat_id)
+        task = asyncio.create_task(self._run(chat_id, model))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def stop(self):
+        """Cancel runs still in flight (called from the app lifespan)."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+chat_summarizer = ChatSummarizer(
+    llm_client.complete,
+    model=config.CHAT_SUMMARY_MODEL,
+    keep_messages=config.CHAT_SUMMARY_KEEP_MESSAGES,
+    batch_messages=config.CHAT_SUMMARY_BATCH_MESSAGES,
+    max_messages=config.CHAT_SUMMARY_MAX_MESSAGES,
+    max_tokens=config.CHAT_SUMMARY_MAX_TOKENS,
+    enabled=config.CHAT_SUMMARY_ENABLED,
+)
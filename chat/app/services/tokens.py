@@ -0,0 +1,49 @@
+from typing import Any, Dict, Optional
+
+from app import config
+
+# Rough tokens-per-character ratio for English text across common tokenizers;
+# the budget only needs to be in the right range, not exact for every model.
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4  # role and separators added by chat templates
+
+
+def _parse_model_budgets(spec: str) -> Dict[str, int]:
+    budgets = {}
+    for entry in spec.split(","):
+        if "=" in entry:
+            model, tokens = entry.rsplit("=", 1)
+            budgets[model.strip()] = int(tokens)
+    return budgets
+
+
+MODEL_CONTEXT_TOKENS = _parse_model_budgets(config.CHAT_CONTEXT_TOKENS_BY_MODEL)
+
+
+def estimate_tokens(content: Any) -> int:
+    """Estimated tokens of message content, plain text or a list of structured parts."""
+    if isinstance(content, str):
+        text_length = len(content)
+    elif isinstance(content, list):
+        text_length = sum(
+            len(part.get("text") or "") for part in content if isinstance(part, dict)
+        )
+    else:
+        text_length = len(str(content or ""))
+    return -(-text_length // CHARS_PER_TOKEN) + MESSAGE_OVERHEAD_TOKENS
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    """Token count stored with the message, estimated for messages stored without one."""
+    tokens = message.get("tokens")
+    if isinstance(tokens, int):
+        return tokens
+    return estimate_tokens(message.get("content"))
+
+
+def context_budget(model: str, requested: Optional[int] = None) -> int:
+    """History budget for a model, lowered to the request's `context_tokens` if given."""
+    budget = MODEL_CONTEXT_TOKENS.get(model, config.CHAT_CONTEXT_TOKENS)
+    if requested is not None:
+        budget = min(budget, requested)
+    return budget
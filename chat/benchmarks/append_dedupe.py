@@ -0,0 +1,93 @@
+"""
+append_message(dedupe=True) latency vs chat length: history scan vs the id index.
+
+"scan" is the previous check (LRANGE the whole list and JSON-decode it to look
+for the id, then RPUSH); "indexed" is the current scripted SADD + RPUSH. Redis
+is fakeredis in-process, so the numbers are the client/server work per append
+without network latency; the scan's transfer cost would add to it over REST.
+
+    cd chat
+    uv run --group dev python -m benchmarks.append_dedupe --lengths 100 1000 10000
+"""
+import os
+
+os.environ.setdefault("REDIS_BACKEND", "native")
+os.environ.setdefault("REDIS_URL", "redis://benchmark.invalid:6379")
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import fakeredis
+from jarvis_shared.redis_client import NativeRedis
+
+from app.services import chat_storage
+from app.services.redis_client import redis_client
+
+
+def _message(i: int) -> dict:
+    return {
+        "id": uuid.uuid4().hex,
+        "role": "user" if i % 2 == 0 else "assistant",
+        "content": f"message {i} " + "lorem ipsum dolor sit amet " * 8,
+        "ts": int(time.time()),
+    }
+
+
+async def scan_append(chat_id: str, message: dict) -> bool:
+    """The previous implementation: full-history dedupe read, then the push."""
+    existing = await chat_storage.get_messages(chat_id)
+    if any(msg.get("id") == message["id"] for msg in existing):
+        return False
+    await redis_client.rpush(chat_storage._chat_messages_key(chat_id), json.dumps(message))
+    return True
+
+
+async def indexed_append(chat_id: str, message: dict) -> bool:
+    return await chat_storage.append_message(chat_id, message, dedupe=True)
+
+
+async def measure(append, length: int, appends: int) -> list:
+    chat_id = uuid.uuid4().hex
+    if length:
+        await redis_client.rpush(
+            chat_storage._chat_messages_key(chat_id), *(json.dumps(_message(i)) for i in range(length))
+        )
+    await append(chat_id, _message(length))  # builds the index for existing history (not timed)
+
+    latencies = []
+    for i in range(appends):
+        message = _message(length + 1 + i)
+        start = time.perf_counter()
+        assert await append(chat_id, message)
+        latencies.append(time.perf_counter() - start)
+    await redis_client.delete(
+        chat_storage._chat_messages_key(chat_id), chat_storage._chat_ids_key(chat_id)
+    )
+    return latencies
+
+
+async def main(lengths: list, appends: int):
+    native = NativeRedis(os.environ["REDIS_URL"])
+    native._target = fakeredis.FakeAsyncRedis(decode_responses=True)
+    redis_client._client = native
+
+    print(f"{'history':>8} | {'scan p50':>10} {'p95':>10} | {'indexed p50':>12} {'p95':>10}  (ms per append)")
+    for length in lengths:
+        row = []
+        for append in (scan_append, indexed_append):
+            latencies = sorted(await measure(append, length, appends))
+            row.append((statistics.median(latencies) * 1000, latencies[int(0.95 * (len(latencies) - 1))] * 1000))
+        (scan_p50, scan_p95), (indexed_p50, indexed_p95) = row
+        print(f"{length:>8} | {scan_p50:>10.3f} {scan_p95:>10.3f} | {indexed_p50:>12.3f} {indexed_p95:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[0, 100, 1000, 10000])
+    parser.add_argument("--appends", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.lengths, args.appends))
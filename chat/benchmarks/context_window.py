@@ -0,0 +1,75 @@
+"""
+History read for one chat turn vs chat length: full LRANGE vs the token-budgeted tail.
+
+Redis is fakeredis in-process, so this is client/server work per read without
+network latency; over REST the full read's transfer grows the same way.
+
+    cd chat
+    uv run --group dev python -m benchmarks.context_window --budget 16000
+"""
+import os
+
+os.environ.setdefault("REDIS_BACKEND", "native")
+os.environ.setdefault("REDIS_URL", "redis://benchmark.invalid:6379")
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import fakeredis
+from jarvis_shared.redis_client import NativeRedis
+
+from app.services import chat_storage
+from app.services.redis_client import redis_client
+from app.services.tokens import estimate_tokens
+
+
+def _message(i: int) -> dict:
+    content = f"message {i} " + "lorem ipsum dolor sit amet " * 8
+    return {
+        "id": uuid.uuid4().hex,
+        "role": "user" if i % 2 == 0 else "assistant",
+        "content": content,
+        "ts": int(time.time()),
+        "tokens": estimate_tokens(content),
+    }
+
+
+async def _timed(read, repeats: int) -> float:
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await read()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+async def main(lengths: list, budget: int, repeats: int):
+    native = NativeRedis(os.environ["REDIS_URL"])
+    native._target = fakeredis.FakeAsyncRedis(decode_responses=True)
+    redis_client._client = native
+
+    print(f"{'history':>8} | {'full ms':>9} {'msgs':>6} | {'budgeted ms':>11} {'msgs':>6}")
+    for length in lengths:
+        chat_id, metadata = chat_storage.new_chat()
+        system = {"id": uuid.uuid4().hex, "role": "system", "content": "You are helpful.", "ts": 0}
+        messages = [system] + [_message(i) for i in range(length)]
+        for i in range(0, len(messages), 1000):
+            await chat_storage.append_messages(chat_id, messages[i:i + 1000], new_chat_metadata=metadata)
+
+        full = await chat_storage.get_messages(chat_id)
+        recent = await chat_storage.get_recent_messages(chat_id, budget)
+        full_ms = await _timed(lambda: chat_storage.get_messages(chat_id), repeats)
+        recent_ms = await _timed(lambda: chat_storage.get_recent_messages(chat_id, budget), repeats)
+        print(f"{length:>8} | {full_ms:>9.3f} {len(full):>6} | {recent_ms:>11.3f} {len(recent):>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--budget", type=int, default=16000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.lengths, args.budget, args.repeats))
@@ -0,0 +1,65 @@
+"""
+Per-token SSE chunk cost: building ChatCompletionChunk models vs the dict + dumps path.
+
+    cd chat
+    uv run --extra fast-json python -m benchmarks.json_encoding
+"""
+import argparse
+import timeit
+
+from jarvis_shared import json_response
+from jarvis_shared.json_response import dumps
+
+from app.schemas.completions import ChatCompletionChunk, ChatCompletionChunkChoice, DeltaMessage
+
+RUN_ID = "chatcmpl-0123456789ab"
+MODEL = "google/gemini-2.5-flash"
+CHAT_ID = "0f8e5b8ac0e34a8d9e3c1f1f2a4b5c6d"
+MESSAGE_ID = "9a8b7c6d5e4f3a2b1c0d9e8f7a6b5c4d"
+TOKEN = " token"
+
+
+def model_chunk() -> bytes:
+    out = ChatCompletionChunk(
+        id=RUN_ID,
+        created=1700000000,
+        model=MODEL,
+        chat_id=CHAT_ID,
+        message_id=MESSAGE_ID,
+        choices=[
+            ChatCompletionChunkChoice(
+                index=0, delta=DeltaMessage(role=None, content=TOKEN), finish_reason=None
+            )
+        ],
+    )
+    return f"data: {out.model_dump_json()}\n\n".encode()
+
+
+def dict_chunk() -> bytes:
+    out = {
+        "id": RUN_ID,
+        "object": "chat.completion.chunk",
+        "created": 1700000000,
+        "model": MODEL,
+        "chat_id": CHAT_ID,
+        "message_id": MESSAGE_ID,
+        "choices": [
+            {"index": 0, "delta": {"role": None, "content": TOKEN}, "finish_reason": None}
+        ],
+    }
+    return b"data: " + dumps(out) + b"\n\n"
+
+
+def main(number: int):
+    assert model_chunk() == dict_chunk(), "fast path must produce identical bytes"
+    print(f"orjson installed: {json_response.orjson is not None}")
+    for label, fn in (("pydantic model", model_chunk), ("dict + dumps", dict_chunk)):
+        per_call = min(timeit.repeat(fn, number=number, repeat=5)) / number
+        print(f"  {label:<15} {per_call * 1e6:8.2f} µs/chunk")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=50000)
+    args = parser.parse_args()
+    main(args.number)
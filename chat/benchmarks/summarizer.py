@@ -0,0 +1,87 @@
+"""
+Prompt size per turn over a long chat, with and without the rolling summary.
+
+Runs fully offline: Redis is fakeredis and the summarizer gets a stub LLM that
+returns a fixed-size summary, so this shows how context assembly behaves (and
+that summaries are written and picked up), not summary quality.
+
+    cd chat
+    uv run --group dev python -m benchmarks.summarizer --turns 200 --budget 4000
+"""
+import os
+
+os.environ.setdefault("REDIS_BACKEND", "native")
+os.environ.setdefault("REDIS_URL", "redis://benchmark.invalid:6379")
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import fakeredis
+from jarvis_shared.redis_client import NativeRedis
+
+from app.services import chat_storage
+from app.services.redis_client import redis_client
+from app.services.summarizer import ChatSummarizer
+from app.services.tokens import estimate_tokens, message_tokens
+
+
+class StubLLM:
+    def __init__(self, summary_words: int):
+        self.summary_words = summary_words
+        self.calls = 0
+        self.prompt_tokens = 0
+
+    async def complete(self, *, model, messages, **kwargs) -> str:
+        self.calls += 1
+        self.prompt_tokens += sum(estimate_tokens(m["content"]) for m in messages)
+        return " ".join(["summary"] * self.summary_words) + f" (update {self.calls})"
+
+
+def _message(role: str, turn: int) -> dict:
+    content = f"{role} turn {turn}: " + "lorem ipsum dolor sit amet " * 12
+    return {"id": uuid.uuid4().hex, "role": role, "content": content, "ts": int(time.time()),
+            "tokens": estimate_tokens(content)}
+
+
+async def simulate(turns: int, budget: int, summarizer) -> list:
+    chat_id, metadata = chat_storage.new_chat()
+    system = {"id": uuid.uuid4().hex, "role": "system", "content": "You are helpful.", "ts": 0}
+    await chat_storage.append_messages(chat_id, [system], new_chat_metadata=metadata)
+
+    rows = []
+    for turn in range(1, turns + 1):
+        context = await chat_storage.get_recent_messages(chat_id, budget)
+        has_summary = any(m["id"] == chat_storage.SUMMARY_MESSAGE_ID for m in context)
+        rows.append((turn, sum(map(message_tokens, context)), len(context), has_summary))
+        await chat_storage.append_messages(chat_id, [_message("user", turn), _message("assistant", turn)])
+        if summarizer is not None:
+            await summarizer.summarize(chat_id, "stub")
+    return rows
+
+
+async def main(turns: int, budget: int):
+    native = NativeRedis(os.environ["REDIS_URL"])
+    native._target = fakeredis.FakeAsyncRedis(decode_responses=True)
+    redis_client._client = native
+
+    llm = StubLLM(summary_words=150)
+    summarizer = ChatSummarizer(llm.complete, keep_messages=20, batch_messages=20)
+    plain = await simulate(turns, budget, None)
+    summarized = await simulate(turns, budget, summarizer)
+
+    print(f"{'turn':>5} | {'tail only: tokens':>17} {'msgs':>5} | {'summary+tail: tokens':>20} {'msgs':>5} {'summary':>8}")
+    step = max(turns // 10, 1)
+    for (turn, tokens, count, _), (_, s_tokens, s_count, has_summary) in zip(plain, summarized):
+        if turn % step == 0 or turn == 1:
+            print(f"{turn:>5} | {tokens:>17} {count:>5} | {s_tokens:>20} {s_count:>5} {str(has_summary):>8}")
+    print(f"summarizer: {llm.calls} LLM calls, {llm.prompt_tokens} prompt tokens in total (off the request path)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=4000)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.budget))
@@ -1,7 +1,14 @@
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from jarvis_shared.json_response import FastJSONResponse
+from jarvis_shared.metrics import MetricsMiddleware, metrics_response
+from jarvis_shared.profiling import ProfileStore, ProfilingMiddleware, profiles_router, profiling_available
+from app import config
 from app.routes.completions import router as completions_router
+from app.services.redis_client import redis_client
+from app.services.summarizer import chat_summarizer
 
 
 logging.basicConfig(
@@ -9,7 +16,32 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 
-app = FastAPI(title="Jarvis Internal Chat Service")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        yield
+    finally:
+        await chat_summarizer.stop()
+        await redis_client.close()
+
+
+app = FastAPI(
+    title="Jarvis Internal Chat Service",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+
+profile_store = ProfileStore(config.PROFILING_DIR, config.PROFILING_MAX_PROFILES)
+if config.PROFILING_TOKEN or config.PROFILING_SAMPLE_RATE > 0:
+    if profiling_available():
+        app.add_middleware(
+            ProfilingMiddleware,
+            store=profile_store,
+            token=config.PROFILING_TOKEN,
+            sample_rate=config.PROFILING_SAMPLE_RATE,
+        )
+    else:
+        logging.getLogger(__name__).warning("Profiling is configured but pyinstrument is not installed")
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,9 +51,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(MetricsMiddleware)
+
 
 @app.get("/")
 def root():
     return {"service": "chat", "status": "ok"}
 
-app.include_router(completions_router)
\ No newline at end of file
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    return metrics_response()
+
+app.include_router(completions_router)
+app.include_router(profiles_router(profile_store, config.PROFILING_TOKEN))
\ No newline at end of file
@@ -0,0 +1,25 @@
+import os
+
+# Must be set before the app (and its config) is imported
+os.environ.update({
+    "REDIS_BACKEND": "native",
+    "REDIS_URL": "redis://test.invalid:6379",
+})
+
+import fakeredis
+import pytest
+from jarvis_shared.redis_client import NativeRedis
+
+from app.services.history_cache import history_cache
+from app.services.redis_client import redis_client
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    """Points the shared client at an in-memory fakeredis server, with an empty history cache."""
+    client = NativeRedis(os.environ["REDIS_URL"])
+    client._target = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(redis_client, "_client", client)
+    for chat_id in list(history_cache._entries):
+        history_cache.invalidate(chat_id)
+    return client
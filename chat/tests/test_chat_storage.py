@@ -0,0 +1,59 @@
+import asyncio
+import json
+import uuid
+
+from app.services import chat_storage
+from app.services.redis_client import redis_client
+
+
+def _message(role: str = "user", content: str = "hello") -> dict:
+    return {"id": uuid.uuid4().hex, "role": role, "content": content}
+
+
+def test_repeated_id_is_stored_once():
+    async def run():
+        chat_id = uuid.uuid4().hex
+        message = _message()
+
+        assert await chat_storage.append_message(chat_id, message)
+        assert not await chat_storage.append_message(chat_id, message)
+        assert await chat_storage.append_message(chat_id, message, dedupe=False)
+
+        assert await chat_storage.get_messages(chat_id) == [message, message]
+
+    asyncio.run(run())
+
+
+def test_chat_stored_before_the_index_is_backfilled():
+    async def run():
+        chat_id = uuid.uuid4().hex
+        old = [_message("user", "first"), _message("assistant", "second")]
+        await redis_client.rpush(
+            chat_storage._chat_messages_key(chat_id), *(json.dumps(m) for m in old), "not json"
+        )
+        assert not await redis_client.exists(chat_storage._chat_ids_key(chat_id))
+
+        assert not await chat_storage.append_message(chat_id, old[0])
+        assert await chat_storage.message_exists(chat_id, old[1]["id"])
+        assert await chat_storage.append_message(chat_id, _message())
+        assert len(await chat_storage.get_messages(chat_id)) == 3
+
+    asyncio.run(run())
+
+
+def test_batch_append_reports_each_message():
+    async def run():
+        chat_id, metadata = chat_storage.new_chat(user_id="alice")
+        system, user = _message("system", "You are helpful."), _message()
+
+        created = await chat_storage.append_messages(chat_id, [system, user], new_chat_metadata=metadata)
+        repeated = await chat_storage.append_messages(chat_id, [user, _message("assistant"), user])
+
+        assert created.stored == [True, True]
+        assert repeated.stored == [False, True, False]
+        assert repeated.version == created.version + 1
+        stored = await redis_client.hgetall(chat_storage._chat_key(chat_id))
+        assert stored["user_id"] == "alice" and stored["version"] == str(repeated.version)
+        assert len(await chat_storage.get_messages(chat_id)) == 3
+
+    asyncio.run(run())
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import uuid
+
+from app.services import chat_storage
+from app.services.history_cache import CachedHistory, ChatHistoryCache, history_cache
+from app.services.redis_client import redis_client
+
+
+def _message(role: str, i: int, tokens: int = 10) -> dict:
+    return {"id": uuid.uuid4().hex, "role": role, "content": f"{role} {i}", "tokens": tokens}
+
+
+async def _chat(turns: int):
+    chat_id, metadata = chat_storage.new_chat()
+    result = await chat_storage.append_messages(
+        chat_id, [_message("system", 0)], new_chat_metadata=metadata
+    )
+    for i in range(turns):
+        result = await chat_storage.append_messages(chat_id, [_message("user", i), _message("assistant", i)])
+    return chat_id, result.version
+
+
+async def _from_redis(chat_id: str, budget: int):
+    history_cache.invalidate(chat_id)
+    return await chat_storage.get_recent_messages(chat_id, budget)
+
+
+def test_cached_history_matches_redis():
+    async def run():
+        chat_id, version = await _chat(turns=10)
+        for budget in (25, 75, 1000):
+            cached = await chat_storage.get_recent_messages(chat_id, budget, version)
+            assert history_cache.get(chat_id, version) is not None
+            assert cached == await _from_redis(chat_id, budget)
+
+        # Appends from this process are written through
+        await chat_storage.get_recent_messages(chat_id, 1000, version)
+        result = await chat_storage.append_messages(chat_id, [_message("user", 10)])
+        assert history_cache.get(chat_id, result.version).select(1000) is not None
+        cached = await chat_storage.get_recent_messages(chat_id, 1000, result.version)
+        assert cached == await _from_redis(chat_id, 1000)
+
+    asyncio.run(run())
+
+
+def test_entry_is_dropped_when_another_writer_changed_the_chat():
+    async def run():
+        chat_id, version = await _chat(turns=3)
+        await chat_storage.get_recent_messages(chat_id, 1000, version)
+
+        # Another replica appends: the list and version move on without this process
+        await redis_client.rpush(chat_storage._chat_messages_key(chat_id), json.dumps(_message("user", 3)))
+        await redis_client.hincrby(chat_storage._chat_key(chat_id), "version", 1)
+
+        # This process's next append reports a previous version it has not seen
+        result = await chat_storage.append_messages(chat_id, [_message("assistant", 3)])
+        assert result.version == version + 2
+        assert history_cache.get(chat_id, result.version) is None
+        assert len(await chat_storage.get_recent_messages(chat_id, 1000, result.version)) == 9
+
+    asyncio.run(run())
+
+
+def test_saving_a_summary_invalidates_the_entry():
+    async def run():
+        chat_id, version = await _chat(turns=3)
+        await chat_storage.get_recent_messages(chat_id, 1000, version)
+
+        assert await chat_storage.save_summary(chat_id, "they said hello", 0, 5)
+        assert history_cache.get(chat_id, version + 1) is None
+
+        messages = await chat_storage.get_recent_messages(chat_id, 1000, version + 1)
+        assert messages[1]["id"] == chat_storage.SUMMARY_MESSAGE_ID
+        assert len(messages) == 4  # system prompt, summary, last turn
+
+    asyncio.run(run())
+
+
+def test_trimmed_entry_falls_back_to_redis_for_larger_budgets():
+    cache = ChatHistoryCache(max_tokens=1000, entry_tokens=30)
+    head = [_message("system", 0)]
+    tail = [_message("user", i) for i in range(5)]
+    cache.put("chat", CachedHistory(version=1, head=head, floor=1, start=1, tail=list(tail)))
+
+    entry = cache.get("chat", 1)
+    assert entry.tail == tail[2:] and entry.start == 3 and cache.tokens == 30
+
+    assert entry.select(30) == head + tail[3:]  # the budget runs out inside the cached tail
+    assert entry.select(1000) is None  # would need messages that were trimmed off
@@ -0,0 +1,89 @@
+import asyncio
+import uuid
+
+from app.services import chat_storage
+from app.services.redis_client import redis_client
+from app.services.summarizer import ChatSummarizer
+
+
+class StubLLM:
+    def __init__(self, *replies: str):
+        self.replies = list(replies)
+        self.calls = []
+
+    async def complete(self, **kwargs) -> str:
+        self.calls.append(kwargs)
+        return self.replies.pop(0)
+
+
+def _message(role: str, i: int) -> dict:
+    return {"id": uuid.uuid4().hex, "role": role, "content": f"{role} message {i}"}
+
+
+async def _chat(turns: int) -> str:
+    chat_id, metadata = chat_storage.new_chat()
+    system = {"id": uuid.uuid4().hex, "role": "system", "content": "You are helpful."}
+    await chat_storage.append_messages(chat_id, [system], new_chat_metadata=metadata)
+    await _add_turns(chat_id, 0, turns)
+    return chat_id
+
+
+async def _add_turns(chat_id: str, first: int, turns: int):
+    for i in range(first, first + turns):
+        await chat_storage.append_messages(chat_id, [_message("user", i), _message("assistant", i)])
+
+
+async def _summary(chat_id: str):
+    return await redis_client.hmget(chat_storage._chat_key(chat_id), "summary", "summary_upto")
+
+
+def _summarizer(llm: StubLLM) -> ChatSummarizer:
+    return ChatSummarizer(llm.complete, model="stub", keep_messages=4, batch_messages=4)
+
+
+def test_nothing_is_summarized_below_the_batch_threshold():
+    async def run():
+        llm = StubLLM("summary")
+        chat_id = await _chat(turns=3)  # 6 messages, 2 of them older than the kept 4
+
+        assert not await _summarizer(llm).summarize(chat_id)
+        assert llm.calls == []
+
+        await _add_turns(chat_id, 3, 1)  # now 4 are due
+        assert await _summarizer(llm).summarize(chat_id)
+        assert await _summary(chat_id) == ["summary", "5"]  # system prompt + 4 folded messages
+
+    asyncio.run(run())
+
+
+def test_summary_from_a_stale_range_is_rejected():
+    async def run():
+        chat_id = await _chat(turns=4)
+        summary, previous_upto, upto, messages = await chat_storage.get_summary_backlog(
+            chat_id, keep=4, limit=100
+        )
+        assert (previous_upto, upto, len(messages)) == (0, 5, 4)
+
+        assert await chat_storage.save_summary(chat_id, "first", previous_upto, upto)
+        # Another run that read the backlog before the first one stored its summary
+        assert not await chat_storage.save_summary(chat_id, "stale", previous_upto, upto)
+
+        assert await _summary(chat_id) == ["first", "5"]
+
+    asyncio.run(run())
+
+
+def test_empty_reply_keeps_the_previous_summary():
+    async def run():
+        llm = StubLLM("first", "  ")
+        summarizer = _summarizer(llm)
+        chat_id = await _chat(turns=4)
+        assert await summarizer.summarize(chat_id)
+
+        await _add_turns(chat_id, 4, 2)
+        assert not await summarizer.summarize(chat_id)
+
+        assert len(llm.calls) == 2
+        assert await _summary(chat_id) == ["first", "5"]
+
+    asyncio.run(run())
@@ -0,0 +1 @@
+"""Infrastructure shared by the backend, chat and worker services."""
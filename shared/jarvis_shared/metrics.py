@@ -0,0 +1,135 @@
+import inspect
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable
+
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# Buckets in seconds, from a local Redis hit to a cold LiveKit call or a long LLM stream
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle an HTTP request, by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+DEPENDENCY_LATENCY = Histogram(
+    "dependency_call_duration_seconds",
+    "Latency of calls to downstream services, by operation and outcome",
+    ["dependency", "operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+DEPENDENCY_ERRORS = Counter(
+    "dependency_call_errors_total",
+    "Failed calls to downstream services",
+    ["dependency", "operation", "error"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "In-process and shared cache lookups",
+    ["cache", "result"],
+)
+RATE_LIMITED = Counter(
+    "rate_limited_requests_total",
+    "Requests rejected by a rate limiter, and whether Redis was consulted",
+    ["limiter", "where"],
+)
+
+
+def observe_dependency(dependency: str, operation: str, seconds: float, error: BaseException = None):
+    outcome = "ok" if error is None else "error"
+    DEPENDENCY_LATENCY.labels(dependency, operation, outcome).observe(seconds)
+    if error is not None:
+        DEPENDENCY_ERRORS.labels(dependency, operation, type(error).__name__).inc()
+
+
+@asynccontextmanager
+async def track(dependency: str, operation: str):
+    """Time the enclosed downstream call."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        observe_dependency(dependency, operation, time.perf_counter() - start, e)
+        raise
+    observe_dependency(dependency, operation, time.perf_counter() - start)
+
+
+async def _timed(dependency: str, operation: str, awaitable: Awaitable) -> Any:
+    async with track(dependency, operation):
+        return await awaitable
+
+
+class InstrumentedPipeline:
+    """Queues commands on the wrapped pipeline; the whole batch is timed as one `pipeline` call."""
+
+    def __init__(self, pipeline):
+        self._pipeline = pipeline
+
+    def __getattr__(self, name: str):
+        return getattr(self._pipeline, name)
+
+    async def exec(self):
+        return await _timed("redis", "pipeline", self._pipeline.exec())
+
+
+class InstrumentedRedis:
+    """Wraps either Redis client so every awaited command is timed, labelled by command name."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def pipeline(self):
+        return InstrumentedPipeline(self._client.pipeline())
+
+    def multi(self):
+        return InstrumentedPipeline(self._client.multi())
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if inspect.isawaitable(result):
+                return _timed("redis", name, result)
+            return result
+
+        return call
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed responses are timed until their last byte."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            ).observe(time.perf_counter() - start)
+
+
+def metrics_response() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,154 @@
+import asyncio
+import hmac
+import logging
+import random
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:  # optional: each service's "profiling" extra
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_SUFFIX = ".speedscope.json"
+ADMIN_PREFIX = "/admin/profiles"  # fetching profiles is never profiled itself
+_NAME_RE = re.compile(r"^[\w.-]+$")
+
+
+def token_matches(token: str, supplied: Optional[str]) -> bool:
+    return bool(token) and supplied is not None and hmac.compare_digest(token, supplied)
+
+
+class ProfileStore:
+    """Keeps the newest `max_profiles` speedscope files in one directory, deleting the oldest."""
+
+    def __init__(self, directory: str, max_profiles: int):
+        if max_profiles < 1:
+            raise ValueError(f"max_profiles must be at least 1, got {max_profiles}")
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+
+    def _files(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob(f"*{PROFILE_SUFFIX}"), key=lambda p: p.stat().st_mtime)
+
+    def save(self, name: str, content: str):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f".{name}.tmp"
+        tmp.write_text(content)
+        tmp.rename(self.directory / name)
+        for old in self._files()[: -self.max_profiles or None]:
+            old.unlink(missing_ok=True)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [
+            {"name": p.name, "bytes": p.stat().st_size, "created_at": int(p.stat().st_mtime)}
+            for p in reversed(self._files())
+        ]
+
+    def path(self, name: str) -> Optional[Path]:
+        if not _NAME_RE.match(name) or not name.endswith(PROFILE_SUFFIX):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+
+class ProfilingMiddleware:
+    """
+    Profiles single requests with pyinstrument and stores them as speedscope JSON.
+
+    A request is profiled when it carries `X-Profile: <token>` or is picked by
+    `sample_rate`. One request is profiled at a time per process; others pass
+    through untouched. The profile's file name is returned in `X-Profile-Id`.
+    Only add this middleware when profiling is configured.
+    """
+
+    def __init__(self, app, store: ProfileStore, token: str, sample_rate: float, interval: float = 0.001):
+        self.app = app
+        self.store = store
+        self.token = token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self._busy = False
+
+    def _wanted(self, scope) -> bool:
+        if self.token:
+            for key, value in scope["headers"]:
+                if key == PROFILE_HEADER.encode():
+                    return token_matches(self.token, value.decode("latin-1"))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or self._busy
+            or scope["path"].startswith(ADMIN_PREFIX)
+            or not self._wanted(scope)
+        ):
+            return await self.app(scope, receive, send)
+
+        self._busy = True
+        slug = re.sub(r"[^\w]+", "_", scope["path"]).strip("_") or "root"
+        name = f"{int(time.time())}-{scope['method']}-{slug}-{uuid.uuid4().hex[:8]}{PROFILE_SUFFIX}"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = [*message.get("headers", []), (PROFILE_ID_HEADER, name.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            self._busy = False
+            elapsed_ms = int((time.perf_counter() - start) * 1000)
+            try:
+                await asyncio.to_thread(
+                    lambda: self.store.save(name, profiler.output(renderer=SpeedscopeRenderer()))
+                )
+                logger.info(f"Saved request profile {name} ({elapsed_ms} ms)")
+            except Exception as e:
+                logger.warning(f"Could not save request profile: {e}")
+
+
+def profiling_available() -> bool:
+    return Profiler is not None
+
+
+def profiles_router(store: ProfileStore, token: str) -> APIRouter:
+    """Serves the stored profiles under ADMIN_PREFIX to callers that send the profiling token."""
+    router = APIRouter(prefix=ADMIN_PREFIX, tags=["admin"])
+
+    def require_profiling_token(x_profile: Optional[str] = Header(None)):
+        if not token_matches(token, x_profile):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Profiling token required")
+
+    @router.get("", dependencies=[Depends(require_profiling_token)])
+    async def list_profiles() -> List[Dict[str, Any]]:
+        """Stored request profiles, newest first. Open them in https://www.speedscope.app."""
+        return store.list()
+
+    @router.get("/{name}", dependencies=[Depends(require_profiling_token)])
+    async def download_profile(name: str):
+        path = store.path(name)
+        if path is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+        return FileResponse(path, media_type="application/json", filename=name)
+
+    return router
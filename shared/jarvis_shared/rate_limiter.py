@@ -0,0 +1,174 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from jarvis_shared.metrics import RATE_LIMITED
+from jarvis_shared.redis_scripts import RedisScript
+
+logger = logging.getLogger(__name__)
+
+# Local deny cache is cleared wholesale beyond this many keys
+MAX_BLOCKED_KEYS = 10000
+
+# Token buckets stored as hashes {t: tokens, ts: last refill (ms)}. A request
+# costs one token from every bucket, and is only charged if all of them have one.
+# KEYS: bucket keys
+# ARGV: now (ms), then capacity and refill rate (tokens/s) for each key
+# Returns {allowed, index of the tightest bucket (1-based), tokens left in it,
+#          ms until it is full again, ms until a request would be allowed}
+TOKEN_BUCKET_SCRIPT = RedisScript("""
+local now = tonumber(ARGV[1])
+local allowed = 1
+local retry_ms = 0
+local tokens = {}
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i])
+    local rate = tonumber(ARGV[2 * i + 1])
+    local state = redis.call('HMGET', KEYS[i], 't', 'ts')
+    local t = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    t = math.min(capacity, t + math.max(0, now - ts) * rate / 1000)
+    if t < 1 then
+        allowed = 0
+        retry_ms = math.max(retry_ms, math.ceil((1 - t) * 1000 / rate))
+    end
+    tokens[i] = t
+end
+local tightest, reset_ms = 1, 0
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i])
+    local rate = tonumber(ARGV[2 * i + 1])
+    if allowed == 1 then
+        tokens[i] = tokens[i] - 1
+        redis.call('HSET', KEYS[i], 't', tostring(tokens[i]), 'ts', now)
+        redis.call('PEXPIRE', KEYS[i], math.ceil(capacity * 1000 / rate))
+    end
+    if tokens[i] < tokens[tightest] then
+        tightest = i
+    end
+end
+local capacity = tonumber(ARGV[2 * tightest])
+local rate = tonumber(ARGV[2 * tightest + 1])
+reset_ms = math.ceil((capacity - tokens[tightest]) * 1000 / rate)
+return {allowed, tightest, math.floor(tokens[tightest]), reset_ms, retry_ms}
+""")
+
+
+@dataclass(frozen=True)
+class Rate:
+    """`limit` requests per `period` seconds, allowed as a burst."""
+
+    limit: int
+    period: float
+
+    @classmethod
+    def parse(cls, spec: str) -> "Rate":
+        """Parse "N/S", e.g. "10/60" for ten requests a minute."""
+        limit, period = spec.split("/")
+        return cls(limit=int(limit), period=float(period))
+
+    @property
+    def per_second(self) -> float:
+        return self.limit / self.period
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_seconds: int
+    retry_after: int = 0
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset_seconds),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter shared by every replica through one Redis script.
+
+    A request is checked against several buckets at once (e.g. per user,
+    per IP, and per tier) and only passes if each of them has a token.
+    Buckets that recently ran dry are remembered locally until they refill,
+    so repeated requests during overload are rejected without a round trip.
+    Redis errors fail open.
+    """
+
+    def __init__(self, redis, name: str):
+        self.redis = redis
+        self.name = name
+        self._blocked: Dict[str, Tuple[float, int]] = {}  # key -> (blocked until, limit)
+        self.local_rejections = 0
+
+    def key(self, scope: str, value: str) -> str:
+        return f"ratelimit:{self.name}:{scope}:{value}"
+
+    def _precheck(self, keys: List[str]) -> Optional[RateLimitDecision]:
+        now = time.time()
+        for key in keys:
+            entry = self._blocked.get(key)
+            if entry is None:
+                continue
+            until, limit = entry
+            if until <= now:
+                del self._blocked[key]
+                continue
+            self.local_rejections += 1
+            RATE_LIMITED.labels(self.name, "local").inc()
+            wait = math.ceil(until - now)
+            return RateLimitDecision(
+                allowed=False, limit=limit, remaining=0, reset_seconds=wait, retry_after=wait
+            )
+        return None
+
+    def _block(self, key: str, seconds: float, limit: int):
+        if len(self._blocked) >= MAX_BLOCKED_KEYS:
+            now = time.time()
+            self._blocked = {k: v for k, v in self._blocked.items() if v[0] > now}
+            if len(self._blocked) >= MAX_BLOCKED_KEYS:
+                self._blocked.clear()
+        self._blocked[key] = (time.time() + seconds, limit)
+
+    async def hit(self, buckets: List[Tuple[str, Rate]]) -> Optional[RateLimitDecision]:
+        """
+        Take one token from each (key, rate) bucket. Returns None if Redis
+        could not be reached, in which case the request is let through.
+        """
+        keys = [key for key, _ in buckets]
+        local = self._precheck(keys)
+        if local is not None:
+            return local
+
+        args: list = [int(time.time() * 1000)]
+        for _, rate in buckets:
+            args += [rate.limit, rate.per_second]
+        try:
+            allowed, tightest, remaining, reset_ms, retry_ms = await TOKEN_BUCKET_SCRIPT(
+                self.redis, keys=keys, args=args
+            )
+        except Exception as e:
+            logger.warning(f"Rate limiter {self.name} unavailable, allowing request: {e}")
+            return None
+
+        key, rate = buckets[int(tightest) - 1]
+        decision = RateLimitDecision(
+            allowed=bool(int(allowed)),
+            limit=rate.limit,
+            remaining=max(int(remaining), 0),
+            reset_seconds=math.ceil(int(reset_ms) / 1000),
+            retry_after=math.ceil(int(retry_ms) / 1000),
+        )
+        if not decision.allowed:
+            RATE_LIMITED.labels(self.name, "redis").inc()
+            self._block(key, int(retry_ms) / 1000, rate.limit)
+        return decision
@@ -0,0 +1,91 @@
+from typing import Any, List, Mapping, Optional
+
+import redis.asyncio as aioredis
+from upstash_redis.asyncio import Redis
+
+
+class _UpstashStyleCommands:
+    """
+    Call signatures of the Upstash client for the commands where redis-py differs.
+
+    Everything else is forwarded untouched, so callers can be written once
+    against the Upstash API and run on either backend.
+    """
+
+    _target: Any
+
+    def __getattr__(self, name: str):
+        return getattr(self._target, name)
+
+    def hset(
+        self,
+        key: str,
+        field: Optional[str] = None,
+        value: Any = None,
+        values: Optional[Mapping[str, Any]] = None,
+    ):
+        return self._target.hset(key, field, value, mapping=values)
+
+    def eval(self, script: str, keys: Optional[List[str]] = None, args: Optional[List[Any]] = None):
+        keys = keys or []
+        return self._target.eval(script, len(keys), *keys, *(args or []))
+
+    def evalsha(self, sha1: str, keys: Optional[List[str]] = None, args: Optional[List[Any]] = None):
+        keys = keys or []
+        return self._target.evalsha(sha1, len(keys), *keys, *(args or []))
+
+
+class NativePipeline(_UpstashStyleCommands):
+    def __init__(self, pipeline: aioredis.client.Pipeline):
+        self._target = pipeline
+
+    async def exec(self) -> List[Any]:
+        return await self._target.execute()
+
+    async def __aenter__(self) -> "NativePipeline":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._target.reset()
+
+
+class NativeRedis(_UpstashStyleCommands):
+    """
+    redis.asyncio over a bounded pool of persistent RESP connections.
+
+    Exposes the same command subset and signatures as `upstash_redis.asyncio.Redis`,
+    including `pipeline()` / `multi()` with `exec()`.
+    """
+
+    def __init__(self, url: str, max_connections: int = 50, timeout: float = 5.0):
+        pool = aioredis.BlockingConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            timeout=timeout,
+            decode_responses=True,
+            health_check_interval=30,
+        )
+        self._target = aioredis.Redis(connection_pool=pool)
+
+    def pipeline(self) -> NativePipeline:
+        return NativePipeline(self._target.pipeline(transaction=False))
+
+    def multi(self) -> NativePipeline:
+        return NativePipeline(self._target.pipeline(transaction=True))
+
+    async def close(self):
+        await self._target.aclose()
+
+
+def create_redis_client(
+    backend: str,
+    *,
+    url: Optional[str] = None,
+    max_connections: int = 50,
+    upstash_url: Optional[str] = None,
+    upstash_token: Optional[str] = None,
+):
+    """Build the Redis client selected by `backend` (REDIS_BACKEND: "upstash" REST or "native" RESP)."""
+    if backend == "native":
+        return NativeRedis(url, max_connections=max_connections)
+    return Redis(url=upstash_url, token=upstash_token)
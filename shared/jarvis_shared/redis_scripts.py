@@ -0,0 +1,27 @@
+import hashlib
+from typing import Any, List, Optional
+
+
+class RedisScript:
+    """
+    A server-side Lua script called by its SHA1 (EVALSHA).
+
+    Falls back to sending the full source (EVAL), which also caches it on the
+    server, the first time a node has not seen the script.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.sha = hashlib.sha1(source.encode()).hexdigest()
+
+    async def __call__(
+        self, redis, keys: Optional[List[str]] = None, args: Optional[List[Any]] = None
+    ) -> Any:
+        keys = keys or []
+        args = [str(a) for a in args or []]
+        try:
+            return await redis.evalsha(self.sha, keys=keys, args=args)
+        except Exception as e:
+            if "NOSCRIPT" not in str(e) and "No matching script" not in str(e):
+                raise
+        return await redis.eval(self.source, keys=keys, args=args)
@@ -15,6 +15,12 @@ LIVEKIT_API_KEY = os.getenv("LIVEKIT_API_KEY")
 GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", BASE_DIR / "google-creds.json")
 UPSTASH_REDIS_REST_URL = os.getenv("UPSTASH_REDIS_REST_URL")
 UPSTASH_REDIS_REST_TOKEN = os.getenv("UPSTASH_REDIS_REST_TOKEN")
+REDIS_BACKEND = os.getenv("REDIS_BACKEND", "upstash")  # "upstash" (REST) or "native" (RESP pool on REDIS_URL)
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "10"))
+
+# When set, the worker only joins rooms it is explicitly dispatched to (backend LIVEKIT_AGENT_NAME)
+AGENT_NAME = os.getenv("AGENT_NAME", "")
 
 DEFAULT_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"  # Rachel
 # DEFAULT_LLM_MODEL = "openai/gpt-5-mini"
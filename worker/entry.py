@@ -20,9 +20,14 @@ async def entry_point(ctx: JobContext):
 
     await ctx.connect()
 
-    # Try LiveKit metadata first
+    # Try the explicit dispatch metadata first, then the room metadata
     agent_config = {}
-    if ctx.room.metadata:
+    if ctx.job.metadata:
+        agent_config = parse_config(ctx.job.metadata)
+        if agent_config:
+            logger.info(f"Using config from dispatch metadata: {agent_config}")
+
+    if not agent_config and ctx.room.metadata:
         try:
             agent_config = parse_config(ctx.room.metadata)
             logger.info(f"Using config from LiveKit metadata: {agent_config}")
@@ -1,6 +1,7 @@
 import logging
 from livekit.agents import WorkerOptions, cli
 from entry import entry_point
+import config
 
 
 logging.basicConfig(
@@ -10,4 +11,4 @@ logging.basicConfig(
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entry_point))
+    cli.run_app(WorkerOptions(entrypoint_fnc=entry_point, agent_name=config.AGENT_NAME))